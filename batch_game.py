@@ -0,0 +1,251 @@
+"""
+Vectorized batch engine: steps many independent games at once with NumPy.
+
+BatchGame is a companion to game.Game for evaluation and data generation.
+It keeps N arenas as stacked arrays and applies the same wall, trail and
+head-on rules as Game.update to all of them in one step() call.
+
+Example:
+    python batch_game.py --games 4096 --players 4 --steps 500
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from game import DIRECTION_DELTAS, grid_size_for_players
+from spawns import plan_spawns
+
+# Per-direction deltas, indexed by direction code (see game.DIRECTIONS)
+DX = np.array([dx for dx, dy in DIRECTION_DELTAS], dtype=np.int32)
+DY = np.array([dy for dx, dy in DIRECTION_DELTAS], dtype=np.int32)
+
+# Number of precomputed spawn layouts per BatchGame
+SPAWN_POOL_SIZE = 256
+
+# Values in BatchGame.winner besides a player id
+IN_PROGRESS = -2
+DRAW = -1
+
+
+class BatchGame:
+    """
+    N independent games of P players on an S x S grid.
+
+    Arrays (all indexed [game] or [game, player]):
+        grid            [N, S, S] uint8, 0 = empty, else owner id + 1
+        x, y            [N, P] head positions
+        direction       [N, P] direction codes (index into game.DIRECTIONS)
+        next_direction  [N, P] direction to take on the next step
+        alive           [N, P] bool
+        game_over       [N] bool
+        winner          [N] player id, DRAW or IN_PROGRESS
+        ticks           [N] steps played in the current game
+
+    With auto_reset=True, games that finish are restarted with fresh spawns
+    at the end of the step that finished them.
+    """
+
+    def __init__(self, num_games, num_players, grid_size=None, seed=None, auto_reset=True):
+        if grid_size is None:
+            grid_size = grid_size_for_players(num_players)
+        if num_players > 255:
+            raise ValueError("BatchGame stores owners in a uint8 grid, so at most 255 players")
+
+        self.num_games = num_games
+        self.num_players = num_players
+        self.grid_size = grid_size
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+
+        n, p, s = num_games, num_players, grid_size
+        self.grid = np.zeros((n, s, s), dtype=np.uint8)
+        self.x = np.zeros((n, p), dtype=np.int32)
+        self.y = np.zeros((n, p), dtype=np.int32)
+        self.direction = np.zeros((n, p), dtype=np.int8)
+        self.next_direction = np.zeros((n, p), dtype=np.int8)
+        self.alive = np.zeros((n, p), dtype=bool)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.winner = np.full(n, IN_PROGRESS, dtype=np.int16)
+        self.ticks = np.zeros(n, dtype=np.int64)
+
+        # Totals across resets, handy for throughput numbers
+        self.games_finished = 0
+        self.total_ticks = 0
+
+        self._spawn_pool = self._build_spawn_pool(SPAWN_POOL_SIZE)
+
+        self.reset()
+
+    # --- Setup ---
+
+    def reset(self, games=None):
+        """
+        Restarts the given games (bool mask or index array; all by default).
+        """
+        if games is None:
+            games = np.arange(self.num_games)
+        else:
+            games = np.asarray(games)
+            if games.dtype == bool:
+                games = np.flatnonzero(games)
+
+        self.grid[games] = 0
+        self.alive[games] = True
+        self.game_over[games] = False
+        self.winner[games] = IN_PROGRESS
+        self.ticks[games] = 0
+
+        # Pick a random layout from the pool for each game, then a random
+        # flip / transpose of it so the pool goes 8x further.
+        count = len(games)
+        layouts = self._spawn_pool[self.rng.integers(0, len(self._spawn_pool), size=count)]
+        x, y = layouts[..., 0], layouts[..., 1]
+        last = self.grid_size - 1
+        flip_x, flip_y, swap = (self.rng.random((3, count, 1)) < 0.5)
+        x = np.where(flip_x, last - x, x)
+        y = np.where(flip_y, last - y, y)
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+
+        directions = self.rng.integers(0, 4, size=(count, self.num_players)).astype(np.int8)
+        self.x[games] = x
+        self.y[games] = y
+        self.direction[games] = directions
+        self.next_direction[games] = directions
+        owners = np.arange(1, self.num_players + 1, dtype=np.uint8)
+        self.grid[games[:, None], y, x] = owners
+
+    def _build_spawn_pool(self, size):
+        """
+        Precomputes `size` spawn layouts ([size, P, 2] of x, y) with
+        spawns.plan_spawns, the same planner Game uses, so resetting a game
+        is just a lookup. Raises ValueError if P players can't fit.
+        """
+        # plan_spawns wants a random.Random; derive one from our generator
+        rng = random.Random(int(self.rng.integers(2 ** 63)))
+        pool = np.empty((size, self.num_players, 2), dtype=np.int32)
+        for layout in range(size):
+            pool[layout] = plan_spawns(self.grid_size, self.num_players, rng)
+        return pool
+
+    # --- Input ---
+
+    def submit_moves(self, directions):
+        """
+        Sets next_direction from an [N, P] array of direction codes.
+        Negative codes mean "no input"; 180-degree turns are ignored,
+        same as Player.set_direction.
+        """
+        directions = np.asarray(directions)
+        reverse = directions == (self.direction ^ 1)
+        accept = (directions >= 0) & ~reverse
+        self.next_direction = np.where(accept, directions, self.next_direction).astype(np.int8)
+
+    def safe_moves(self):
+        """
+        [N, P, 4] bool: which directions lead to an empty in-bounds cell
+        next step (ignoring what the other players do) and aren't a 180.
+        """
+        s = self.grid_size
+        nx = self.x[..., None] + DX
+        ny = self.y[..., None] + DY
+        in_bounds = (nx >= 0) & (nx < s) & (ny >= 0) & (ny < s)
+        games = np.arange(self.num_games)[:, None, None]
+        free = self.grid[games, np.clip(ny, 0, s - 1), np.clip(nx, 0, s - 1)] == 0
+        not_reverse = np.arange(4) != (self.direction ^ 1)[..., None]
+        return in_bounds & free & not_reverse & self.alive[..., None]
+
+    def random_safe_moves(self):
+        """
+        A cheap vectorized policy: a random safe direction for every player
+        (or a random one if none is safe).
+        """
+        scores = self.rng.random(self.x.shape + (4,)) + self.safe_moves()
+        return scores.argmax(axis=-1).astype(np.int8)
+
+    # --- Simulation ---
+
+    def step(self, directions=None):
+        """
+        Advances every unfinished game by one tick.
+        Returns (done, winners): done[g] is True for games that ended on this
+        step, winners[g] is their winner (player id or DRAW), IN_PROGRESS otherwise.
+        """
+        if directions is not None:
+            self.submit_moves(directions)
+
+        s = self.grid_size
+        active = ~self.game_over
+        moving = self.alive & active[:, None]
+
+        # 1. Move
+        self.direction = np.where(moving, self.next_direction, self.direction)
+        self.x = self.x + DX[self.direction] * moving
+        self.y = self.y + DY[self.direction] * moving
+
+        # 2. Collisions
+        # A) Wall
+        in_bounds = (self.x >= 0) & (self.x < s) & (self.y >= 0) & (self.y < s)
+        dies = moving & ~in_bounds
+
+        g, p = np.nonzero(moving & in_bounds)
+        flat_grid = self.grid.reshape(-1)
+        cells = (g * s + self.y[g, p]) * s + self.x[g, p]
+
+        # B) Trail
+        hit_trail = flat_grid[cells] != 0
+        dies[g[hit_trail], p[hit_trail]] = True
+        g, p, cells = g[~hit_trail], p[~hit_trail], cells[~hit_trail]
+
+        # C) Head-on: everyone who lands on a shared cell dies
+        _, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+        head_on = counts[inverse] > 1
+        dies[g[head_on], p[head_on]] = True
+        g, p, cells = g[~head_on], p[~head_on], cells[~head_on]
+
+        # 3. Claim the new head cells
+        flat_grid[cells] = (p + 1).astype(np.uint8)
+        self.alive &= ~dies
+        self.ticks += active
+        self.total_ticks += int(active.sum())
+
+        # 4. Check for game over
+        alive_count = self.alive.sum(axis=1)
+        done = active & (alive_count <= 1)
+        winners = np.full(self.num_games, IN_PROGRESS, dtype=np.int16)
+        winners[done] = np.where(alive_count[done] == 1, self.alive[done].argmax(axis=1), DRAW)
+        self.winner[done] = winners[done]
+        self.game_over |= done
+        self.games_finished += int(done.sum())
+
+        if self.auto_reset and done.any():
+            self.reset(done)
+
+        return done, winners
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput check for the batch engine.")
+    parser.add_argument('--games', type=int, default=1024, help="games stepped in parallel")
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--grid-size', type=int, default=None)
+    parser.add_argument('--steps', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    batch = BatchGame(args.games, args.players, args.grid_size, args.seed)
+
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        batch.step(batch.random_safe_moves())
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.games} games x {args.steps} steps on {batch.grid_size}x{batch.grid_size} "
+          f"({args.players} players, random safe moves) in {elapsed:.2f}s")
+    print(f"  {batch.total_ticks / elapsed:.0f} game ticks/sec, "
+          f"{batch.games_finished / elapsed:.0f} finished games/sec")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,410 @@
+"""
+Reproducible micro-benchmarks for the engine and the bots.
+
+Builds seeded positions at several grid sizes and fill levels, then times
+Game.update, Game.get_state, the JSON and binary (wire.py) update
+encodings and every bot's get_move on them. --massive adds whole
+ticks of the massive-arena preset (simulate.py --massive). Results are
+written as JSON; --compare checks them against a saved baseline and exits
+with status 1 if anything got slower than --threshold allows.
+
+--mcts adds mcts_bot's report: playouts/sec (optionally over several
+root-parallel worker processes) and its 1v1 record against the original
+seven bots.
+
+Example:
+    python benchmark.py --out baseline.json
+    ... change something ...
+    python benchmark.py --compare baseline.json
+"""
+import argparse
+import copy
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bots.mcts_bot as mcts_bot
+from game import Game, DIRECTIONS, GRID_SIZE_BY_PLAYERS
+from bot_runner import BOT_CONFIG, BotRunner, bot_kwargs
+from simulate import MASSIVE_GRID_SIZE, build_player_config, massive_bot_names, run_matches
+from spawns import plan_spawns
+from wire import encode_frame
+
+# The UI's arena sizes plus a few big ones
+DEFAULT_GRID_SIZES = sorted(GRID_SIZE_BY_PLAYERS.values()) + [100, 250, 500]
+DEFAULT_FILLS = [0.1, 0.3, 0.5]
+LARGE_GRID_PLAYERS = 8
+
+# Each benchmark runs for at least MIN_TIME seconds and MIN_REPS reps
+MIN_TIME = 0.2
+MIN_REPS = 3
+MAX_REPS = 1000
+
+# Copies of the position made up front for timing update() (it mutates the game)
+UPDATE_COPIES = 20
+
+# The massive benchmark times the first MASSIVE_TICKS ticks (bots + update)
+# of the --massive preset, while nearly every player is still alive.
+# The published target for that mode: the median tick must run at least
+# this fast.
+MASSIVE_TICKS = 50
+MASSIVE_TARGET_TICKS_PER_SEC = 100
+
+# The MCTS report: searches of MCTS_WORK simulated moves (about 40x a
+# move's budget) on a 10%-full board of each grid size against the two
+# nearest rivals, and MCTS_GAMES 1v1 games against each opponent
+MCTS_WORK = 100_000
+MCTS_GAMES = 10
+MCTS_OPPONENTS = ['gemini_bot', 'chatgpt_bot', 'claude_bot', 'meta_bot',
+                  'grok_bot', 'deepseek_bot', 'qwen_bot']
+
+
+# --- 1. Positions ---
+def players_for_grid(grid_size):
+    for count, size in GRID_SIZE_BY_PLAYERS.items():
+        if size == grid_size:
+            return count
+    return LARGE_GRID_PLAYERS
+
+
+def build_position(grid_size, fill, seed):
+    """
+    A Game mid-way through: players at their spawns with random wall
+    segments scattered over the board until `fill` of the cells are taken.
+    The walls belong to an extra dead "filler" player so they show up in
+    get_state() trails like real ones would. Cells next to live heads are
+    left open so the bots have something to think about.
+    """
+    rng = random.Random(seed)
+
+    bot_names = list(BOT_CONFIG)
+    count = players_for_grid(grid_size)
+    player_config = [
+        {'name': bot_names[i % len(bot_names)], 'color': '#FFFFFF'}
+        for i in range(count)
+    ]
+    player_config.append({'name': 'filler', 'color': '#333333'})
+    # The filler doesn't need a real spawn (or the room for one): park it in a corner
+    spawns = [(x, y, rng.randrange(len(DIRECTIONS)))
+              for x, y in plan_spawns(grid_size, count, rng)]
+    spawns.append((0, 0, 0))
+    game = Game(grid_size, player_config, spawns=spawns, seed=seed)
+
+    filler = game.players[-1]
+    filler.is_alive = False
+    filler.death_tick = 0
+    del filler.trail[:]
+
+    keep_open = set()
+    for p in game.players[:-1]:
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                keep_open.add((p.x + dx, p.y + dy))
+
+    target = int(fill * grid_size * grid_size)
+    taken = sum(1 for cell in game.grid if cell)
+    deltas = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+    while taken < target:
+        x = rng.randrange(grid_size)
+        y = rng.randrange(grid_size)
+        dx, dy = rng.choice(deltas)
+        for _ in range(rng.randint(3, 12)):
+            if not (0 <= x < grid_size and 0 <= y < grid_size) or taken >= target:
+                break
+            if (x, y) not in keep_open and not game.is_occupied(x, y):
+                game._occupy(x, y, filler.id)
+                filler.trail.append(y * grid_size + x)
+                taken += 1
+            x += dx
+            y += dy
+
+    return game
+
+
+# --- 2. Timing ---
+def time_calls(func, min_time=MIN_TIME):
+    """
+    Calls func() repeatedly and returns per-call timings in seconds.
+    """
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < MIN_REPS or (time.perf_counter() < deadline and len(timings) < MAX_REPS):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def summarize_timings(timings):
+    return {
+        'median_us': statistics.median(timings) * 1e6,
+        'min_us': min(timings) * 1e6,
+        'reps': len(timings),
+    }
+
+
+def wanted(name, only):
+    """
+    Whether --only (a list of substrings, None for everything) selects `name`.
+    """
+    return only is None or any(part in name for part in only)
+
+
+def bench_position(grid_size, fill, seed, only=None, min_time=MIN_TIME):
+    """
+    Runs every benchmark on one position and returns {name: summary}.
+    """
+    game = build_position(grid_size, fill, seed)
+    suffix = f"grid={grid_size}/fill={fill}"
+    results = {}
+
+    name = f"update/{suffix}"
+    if wanted(name, only):
+        copies = [copy.deepcopy(game) for _ in range(UPDATE_COPIES)]
+        timings = []
+        deadline = time.perf_counter() + min_time
+        while len(timings) < MIN_REPS or (copies and time.perf_counter() < deadline):
+            target = copies.pop() if copies else copy.deepcopy(game)
+            started = time.perf_counter()
+            target.update()
+            timings.append(time.perf_counter() - started)
+        results[name] = summarize_timings(timings)
+
+    name = f"get_state/{suffix}"
+    if wanted(name, only):
+        results[name] = summarize_timings(time_calls(game.get_state, min_time))
+
+    # What a full snapshot costs on the wire (deltas are timed by bench_massive)
+    encoders = {
+        'json': lambda: json.dumps(game.get_update()).encode(),
+        'binary': lambda: encode_frame(game),
+    }
+    for encoding, encode in encoders.items():
+        name = f"wire/{encoding}/full/{suffix}"
+        if wanted(name, only):
+            results[name] = summarize_timings(time_calls(encode, min_time))
+            results[name]['bytes'] = len(encode())
+
+    state = game.get_state()
+    board = game.board_view()
+    for bot_name, bot_info in BOT_CONFIG.items():
+        name = f"bot/{bot_name}/{suffix}"
+        if not wanted(name, only):
+            continue
+        module = bot_info['module']
+        kwargs = bot_kwargs(module, board, random.Random(seed))
+        call = lambda: module.get_move(state, 0, **kwargs)
+        results[name] = summarize_timings(time_calls(call, min_time))
+
+    return results
+
+
+def bench_massive(seed, only=None):
+    """
+    Times whole ticks of a fresh massive-arena game, and encoding each
+    tick's delta as JSON and as a wire.py frame: {name: summary}.
+    """
+    bot_names = massive_bot_names()
+    suffix = f"players={len(bot_names)}/grid={MASSIVE_GRID_SIZE}"
+    tick_name = f"massive/tick/{suffix}"
+    wire_names = {}
+    for encoding in ('json', 'binary'):
+        name = f"massive/wire/{encoding}/delta/{suffix}"
+        if wanted(name, only):
+            wire_names[encoding] = name
+    if not wanted(tick_name, only) and not wire_names:
+        return {}
+
+    player_config, bot_modules = build_player_config(bot_names)
+    game = Game(MASSIVE_GRID_SIZE, player_config, seed=seed, massive=True)
+    runner = BotRunner(bot_modules)
+
+    timings = []
+    encodings = {encoding: ([], []) for encoding in wire_names}  # (timings, sizes)
+    while len(timings) < MASSIVE_TICKS and not game.game_over:
+        started = time.perf_counter()
+        runner.run_turns(game)
+        game.update()
+        timings.append(time.perf_counter() - started)
+
+        since = game.tick - 1
+        for encoding, encode in (('json', lambda: json.dumps(game.get_update(since)).encode()),
+                                 ('binary', lambda: encode_frame(game, since))):
+            if encoding not in encodings:
+                continue
+            started = time.perf_counter()
+            frame = encode()
+            encodings[encoding][0].append(time.perf_counter() - started)
+            encodings[encoding][1].append(len(frame))
+    runner.close()
+
+    results = {}
+    if wanted(tick_name, only):
+        results[tick_name] = summarize_timings(timings)
+    for encoding, (encode_timings, sizes) in encodings.items():
+        name = wire_names[encoding]
+        results[name] = summarize_timings(encode_timings)
+        results[name]['bytes'] = round(statistics.median(sizes))
+    return results
+
+
+def bench_mcts(grid_sizes, seed, games=MCTS_GAMES, workers=1):
+    """
+    mcts_bot's report. Returns ({name: summary} of whole searches, each
+    with its 'playouts_per_sec' over `workers` processes; {opponent: win/draw/loss counts and
+    win_rate} from `games` seeded 1v1 games against each opponent).
+    The games run with the bot's normal, single-process budget.
+    """
+    results = {}
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for grid_size in grid_sizes:
+            game = build_position(grid_size, 0.1, seed * 1000003 + grid_size)
+            heads = [p.y * grid_size + p.x for p in game.players[:1 + mcts_bot.MAX_RIVALS]]
+            cells = bytes(game.board_view().cells)
+            playouts = []
+
+            def call():
+                stats = mcts_bot.search_root(grid_size, cells, heads, MCTS_WORK,
+                                             random.Random(seed), 60.0, pool=pool,
+                                             workers=workers)
+                playouts.append(sum(visits for visits, _ in stats.values()))
+
+            if pool is not None:
+                call()  # Start the workers before timing
+            name = f"mcts/search/workers={workers}/grid={grid_size}"
+            results[name] = summarize_timings(time_calls(call))
+            results[name]['playouts_per_sec'] = round(playouts[-1] / (results[name]['median_us'] / 1e6))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    record = {}
+    for opponent in MCTS_OPPONENTS:
+        wins = run_matches(['mcts_bot', opponent], seed=seed, games=games)['wins']
+        record[opponent] = {
+            'wins': wins['mcts_bot'],
+            'draws': wins['DRAW'],
+            'losses': wins[opponent],
+            'win_rate': wins['mcts_bot'] / games if games else 0.0,
+        }
+    return results, record
+
+
+def run_benchmarks(grid_sizes, fills, seed=0, only=None, min_time=MIN_TIME, massive=False):
+    results = {}
+    for grid_size in grid_sizes:
+        for fill in fills:
+            position_seed = seed * 1000003 + grid_size * 101 + int(fill * 100)
+            position = bench_position(grid_size, fill, position_seed, only, min_time)
+            for name, summary in position.items():
+                size = f", {summary['bytes']} bytes" if 'bytes' in summary else ''
+                print(f"  {name:<45} {summary['median_us']:>12.1f} us  (n={summary['reps']}{size})")
+            results.update(position)
+
+    if massive:
+        massive_results = bench_massive(seed, only)
+        for name, summary in massive_results.items():
+            if 'bytes' in summary:
+                print(f"  {name:<45} {summary['median_us']:>12.1f} us  ({summary['bytes']} bytes)")
+                continue
+            rate = 1e6 / summary['median_us']
+            verdict = 'ok' if rate >= MASSIVE_TARGET_TICKS_PER_SEC else 'BELOW TARGET'
+            print(f"  {name:<45} {summary['median_us']:>12.1f} us  "
+                  f"({rate:.0f} ticks/sec, target {MASSIVE_TARGET_TICKS_PER_SEC}: {verdict})")
+        results.update(massive_results)
+    return results
+
+
+# --- 3. Baselines ---
+def compare(results, baseline, threshold):
+    """
+    Prints how each benchmark moved against the baseline and returns the
+    names of the ones whose median got slower by more than `threshold`.
+    """
+    regressions = []
+    print(f"{'benchmark':<45} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        old = baseline[name]['median_us']
+        new = results[name]['median_us']
+        change = (new - old) / old if old else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  <-- REGRESSION'
+            regressions.append(name)
+        print(f"{name:<45} {old:>10.1f}us {new:>10.1f}us {change:>+7.0%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Game and the bots.")
+    parser.add_argument('--grid-sizes', type=int, nargs='+', default=DEFAULT_GRID_SIZES)
+    parser.add_argument('--fills', type=float, nargs='+', default=DEFAULT_FILLS,
+                        help="fraction of cells already taken in each position")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', default=None, metavar='TEXT',
+                        help="only run benchmarks whose name contains one of these")
+    parser.add_argument('--min-time', type=float, default=MIN_TIME,
+                        help="seconds to spend on each benchmark")
+    parser.add_argument('--out', default=None, help="write results to this JSON file")
+    parser.add_argument('--massive', action='store_true',
+                        help="also time whole ticks of the 256-player massive preset")
+    parser.add_argument('--mcts', action='store_true',
+                        help="also report mcts_bot's playouts/sec and win rates")
+    parser.add_argument('--mcts-games', type=int, default=MCTS_GAMES,
+                        help="1v1 games against each opponent for --mcts")
+    parser.add_argument('--mcts-workers', type=int, default=1,
+                        help="root-parallel worker processes for the --mcts searches")
+    parser.add_argument('--compare', default=None, metavar='BASELINE',
+                        help="compare against a JSON file written by --out")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed slowdown before flagging a regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.grid_sizes, args.fills, args.seed, args.only, args.min_time,
+                             args.massive)
+
+    mcts_record = None
+    if args.mcts:
+        searches, mcts_record = bench_mcts(args.grid_sizes, args.seed, args.mcts_games,
+                                           args.mcts_workers)
+        for name, summary in searches.items():
+            print(f"  {name:<45} {summary['median_us']:>12.1f} us  "
+                  f"({summary['playouts_per_sec']} playouts/sec)")
+        for opponent, games in mcts_record.items():
+            print(f"  mcts_bot vs {opponent:<33} {games['win_rate']:>11.0%}   "
+                  f"({games['wins']}-{games['draws']}-{games['losses']} W-D-L)")
+        results.update(searches)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'seed': args.seed,
+                    'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                },
+                'results': results,
+                'mcts_record': mcts_record,
+            }, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == '__main__':
+    main()
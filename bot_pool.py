@@ -0,0 +1,402 @@
+"""
+Parallel bot moves on a pool of warm worker processes.
+
+BotPool starts its workers once; each imports the bot modules up front
+and then waits for work. Every tick, ParallelBotRunner copies the board
+(occupancy grid and region labels) into its own shared memory block,
+sends each worker the small per-tick data (heads, directions, region
+sizes, which bots to ask) and gathers the moves before Game.update().
+Bots run at the same time on different cores, so a tick takes about as
+long as the slowest bot instead of all of them added up.
+
+Runners can tick from different threads at once (e.g. one per session).
+A worker has one job at a time: a runner that needs a busy worker waits
+for it to finish, and the pool's collector thread hands every reply to
+the runner waiting for it and frees its worker.
+
+ParallelBotRunner is a drop-in for bot_runner.BotRunner: same run_turns,
+overruns and close(). Each player is pinned to one worker, which gets a
+copy of the player's random stream (Game.player_rngs) with its first
+move and keeps drawing from it, so a seeded game plays exactly as it
+does with the sequential runner. A worker that dies is restarted; its
+players miss that tick and their streams start over on the new process.
+
+Example:
+    pool = BotPool(4)
+    runner = ParallelBotRunner(pool, bot_modules, move_timeout=0.05)
+    ...
+    runner.run_turns(game); game.update()
+    ...
+    pool.close()
+"""
+import importlib
+import itertools
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import Future, wait
+from multiprocessing import connection, resource_tracker, shared_memory
+from types import SimpleNamespace
+
+# Importing bot_runner imports every bot, so workers start warm
+from bot_runner import accepts_board, bot_kwargs
+from game import BoardView
+
+# Bytes per cell of the region label array (array('I'))
+_LABEL_BYTES = 4
+
+# Ids for runners, so workers can keep their players' random streams apart
+_runner_ids = itertools.count()
+
+
+# --- 1. Worker side ---
+def _worker_main(conn):
+    """
+    Worker loop. Jobs are (runner id, board header, state, asks, finished
+    runner ids), with asks as [(player id, module name, rng key, rng state
+    or None)]; the reply is [(player id, move, error, seconds), ...].
+    None stops the worker.
+    """
+    modules = {}
+    rngs = {}      # (runner id, player id) -> that player's random.Random
+    memos = {}     # runner id -> its game's BoardView.memo, for this worker's players
+    segments = {}  # runner id -> its board's SharedMemory
+    conn.send('ready')
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        runner_id, header, current_state, asks, finished = job
+        shm_name, grid_size, typecode, heads, directions, alive, sizes = header
+        for key in list(rngs):
+            if key[0] in finished:
+                del rngs[key]
+        for key in finished:
+            memos.pop(key, None)
+            if key in segments:
+                segments.pop(key).close()
+
+        shm = segments.get(runner_id)
+        if shm is None or shm.name != shm_name:
+            if shm is not None:
+                segments.pop(runner_id).close()
+            try:
+                shm = shared_memory.SharedMemory(name=shm_name)
+            except FileNotFoundError:
+                # A late job for a runner that has closed since: nobody's waiting for it
+                conn.send([(player_id, None, 'board closed', 0.0) for player_id, _, _, _ in asks])
+                continue
+            segments[runner_id] = shm
+            # The runner owns the block; don't let this process's tracker unlink it
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        cell_count = grid_size * grid_size
+        cell_bytes = cell_count * (2 if typecode == 'H' else 1)
+        cells = shm.buf[:cell_bytes].cast(typecode)
+        labels = shm.buf[cell_bytes:cell_bytes + cell_count * _LABEL_BYTES].cast('I')
+        regions = SimpleNamespace(labels=labels, sizes=sizes)
+        board = BoardView(grid_size, cells, heads, directions, alive, regions, copy=False,
+                          memo=memos.setdefault(runner_id, {}))
+
+        replies = []
+        for player_id, module_name, rng_key, rng_state in asks:
+            module = modules.get(module_name)
+            if module is None:
+                module = modules[module_name] = importlib.import_module(module_name)
+            if rng_state is not None:
+                rngs[rng_key] = random.Random()
+                rngs[rng_key].setstate(rng_state)
+            started = time.perf_counter()
+            move = error = None
+            try:
+                move = module.get_move(current_state, player_id,
+                                       **bot_kwargs(module, board, rngs[rng_key]))
+            except Exception as e:
+                error = repr(e)
+            replies.append((player_id, move, error, time.perf_counter() - started))
+
+        # Drop our views before replying, so the block can be closed
+        del board, regions, cells, labels
+        conn.send(replies)
+
+    for shm in segments.values():
+        shm.close()
+    conn.close()
+
+
+# --- 2. The pool ---
+class _Worker:
+    def __init__(self, context):
+        self.context = context
+        self.start()
+
+    def start(self):
+        """
+        Starts (or restarts) the process. A fresh process has no random
+        streams or boards yet, so it starts with no job and nothing to forget.
+        """
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=_worker_main, args=(child_conn,),
+                                            daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.job = None         # Future for the replies to the job it's working on, if any
+        self.abandoned = False  # Whether that job's runner stopped waiting for it
+        self.finished = []      # Runner ids to tell it about with its next job
+
+
+class BotPool:
+    """
+    `workers` warm processes. One pool can serve any number of runners
+    (e.g. one per session), from any number of threads.
+    """
+
+    def __init__(self, workers=None):
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if workers < 1:
+            raise ValueError("A BotPool needs at least one worker")
+        context = multiprocessing.get_context()
+        self.workers = [_Worker(context) for _ in range(workers)]
+        for worker in self.workers:
+            worker.conn.recv()  # 'ready': bots imported
+        # Guards the workers' job state; notified whenever a worker frees up
+        self._changed = threading.Condition()
+        self._closing = False
+        self._collector = threading.Thread(target=self._collect, name='bot-pool-collector',
+                                           daemon=True)
+        self._collector.start()
+
+    def submit(self, worker, runner_id, header, current_state, asks):
+        """
+        Sends the worker a job (see _worker_main), first waiting for it to
+        finish the one it has. Returns a Future for the replies, or None if
+        the worker is stuck on a job its runner has given up on or has died.
+        """
+        with self._changed:
+            while worker.job is not None and not worker.abandoned:
+                self._changed.wait()
+            if worker.job is not None:
+                return None
+            try:
+                worker.conn.send((runner_id, header, current_state, asks, worker.finished))
+            except OSError:
+                # It died; the collector restarts it once it sees the pipe close
+                return None
+            worker.job = Future()
+            worker.finished = []
+            return worker.job
+
+    def abandon(self, worker, job):
+        """
+        Stops waiting for `job` (a Future from submit): the worker counts
+        as stuck until it finishes.
+        """
+        with self._changed:
+            if worker.job is job:
+                worker.abandoned = True
+                self._changed.notify_all()
+
+    def _collect(self):
+        """
+        Collector thread: reads every reply as it arrives, frees its worker
+        and resolves its job's Future. A worker that dies (a bot crashed
+        the process, or it was killed) is restarted in place; its job fails
+        and its bots overrun that tick. Ends once all the workers have
+        stopped after close().
+        """
+        workers = {worker.conn: worker for worker in self.workers}
+        while workers:
+            for conn in connection.wait(list(workers)):
+                worker = workers[conn]
+                try:
+                    replies = conn.recv()
+                    error = None
+                except (EOFError, OSError):
+                    del workers[conn]
+                    replies, error = None, RuntimeError("Bot worker stopped")
+                if replies == 'ready':  # A restarted worker is up
+                    continue
+                with self._changed:
+                    job, worker.job, worker.abandoned = worker.job, None, False
+                    if error is not None and not self._closing:
+                        self._restart(worker)
+                        workers[worker.conn] = worker
+                    self._changed.notify_all()
+                if job is None:
+                    continue
+                if error is None:
+                    job.set_result(replies)
+                else:
+                    job.set_exception(error)
+
+    def _restart(self, worker):
+        process = worker.process
+        if process.is_alive():
+            process.terminate()
+        process.join(timeout=1)
+        print(f"Bot worker {process.pid} stopped (exit code {process.exitcode}); restarting it")
+        worker.conn.close()
+        worker.start()
+
+    def forget(self, runner_id):
+        """
+        Lets the workers drop a finished runner's random streams and board.
+        """
+        with self._changed:
+            for worker in self.workers:
+                worker.finished.append(runner_id)
+
+    def close(self):
+        with self._changed:
+            self._closing = True
+        for worker in self.workers:
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self.workers:
+            worker.process.join(timeout=1)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        self._collector.join(timeout=1)
+        for worker in self.workers:
+            worker.conn.close()
+        self.workers = []
+
+
+# --- 3. Per-game runner ---
+class ParallelBotRunner:
+    """
+    BotRunner's job, with the bots spread over a BotPool's workers.
+
+    Player i always runs on worker i % workers. With move_timeout set,
+    moves are gathered until every worker has answered or the deadline
+    passes (move_timeout per bot a worker has to run in turn). A bot that
+    misses it keeps its current direction and is recorded in
+    self.overruns as {'tick', 'player_id', 'bot'}; a worker still busy
+    with a late job gets no new work (its bots overrun again) until it
+    finishes. A worker busy with another runner's job in time is waited
+    for, and the deadline starts once the last job is sent. Not for use
+    by two threads at once; separate runners are.
+    """
+
+    def __init__(self, pool, bot_modules, move_timeout=None, metrics=None):
+        self.pool = pool
+        self.bot_modules = bot_modules
+        self.move_timeout = move_timeout
+        self.metrics = metrics
+        self.overruns = []
+        self._module_names = [None if m is None else m.__name__ for m in bot_modules]
+        self._id = next(_runner_ids)
+        self._rng_shipped = {}  # Player id -> the worker process that has its rng
+        self._shm = None
+
+    def _board_block(self, size):
+        """
+        This runner's shared memory block, of at least `size` bytes.
+        """
+        if self._shm is None or self._shm.size < size:
+            self._release_block()
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        return self._shm
+
+    def _release_block(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()  # Workers still mapping it keep it until they close it
+            self._shm = None
+
+    def _ship_board(self, game):
+        grid = game._grid
+        typecode = getattr(grid, 'typecode', 'B')
+        cells = memoryview(grid).cast('B')
+        labels = memoryview(game.regions.labels).cast('B')
+        shm = self._board_block(len(cells) + len(labels))
+        shm.buf[:len(cells)] = cells
+        shm.buf[len(cells):len(cells) + len(labels)] = labels
+        players = game.players
+        return (shm.name, game.grid_size, typecode,
+                [(p.x, p.y) for p in players],
+                [p.direction_name for p in players],
+                [p.is_alive for p in players],
+                dict(game.regions.sizes))
+
+    def run_turns(self, game):
+        pool = self.pool
+        metrics = self.metrics
+        if metrics:
+            started = time.perf_counter()
+
+        asks = [i for i, module in enumerate(self.bot_modules)
+                if module is not None and game.players[i].is_alive]
+        if not asks:
+            return
+
+        workers = pool.workers
+        shares = {}
+        for i in asks:
+            shares.setdefault(workers[i % len(workers)], []).append(i)
+
+        header = self._ship_board(game)
+        needs_state = any(not accepts_board(self.bot_modules[i]) for i in asks)
+        current_state = game.get_state() if needs_state else None
+
+        if metrics:
+            built = time.perf_counter()
+            metrics.record('get_state', built - started, game.grid_size)
+
+        waiting = {}
+        for worker, share in shares.items():
+            process = worker.process
+            jobs = []
+            for i in share:
+                rng_state = None
+                if self._rng_shipped.get(i) is not process:
+                    rng_state = game.player_rngs[i].getstate()
+                jobs.append((i, self._module_names[i], (self._id, i), rng_state))
+            job = pool.submit(worker, self._id, header, current_state, jobs)
+            if job is not None:
+                waiting[job] = worker
+                self._rng_shipped.update(dict.fromkeys(share, process))
+
+        timeout = None
+        if self.move_timeout is not None and waiting:
+            timeout = self.move_timeout * max(len(shares[worker]) for worker in waiting.values())
+        done, late = wait(waiting, timeout)
+        for job in late:
+            pool.abandon(waiting[job], job)
+
+        answered = set()
+        for job in done:
+            if job.exception() is not None:
+                print(f"Error getting moves from bot worker: {job.exception()}")
+                continue
+            for player_id, move, error, seconds in job.result():
+                answered.add(player_id)
+                if metrics:
+                    metrics.record_bot(game.players[player_id].name, seconds, game.grid_size)
+                if error is not None:
+                    print(f"Error getting move from bot {player_id}: {error}")
+                elif move:
+                    game.submit_move(player_id, move)
+
+        for share in shares.values():
+            for i in share:
+                if i not in answered:
+                    self._record_overrun(game, i)
+
+        if metrics:
+            metrics.record('bots', time.perf_counter() - built, game.grid_size)
+
+    def _record_overrun(self, game, player_id):
+        self.overruns.append({'tick': game.tick, 'player_id': player_id,
+                              'bot': game.players[player_id].name})
+
+    def close(self):
+        """
+        The workers belong to the pool; this lets them drop this game's
+        random streams and board, and frees the board's shared memory.
+        """
+        self.pool.forget(self._id)
+        self._release_block()
@@ -0,0 +1,269 @@
+"""
+Bot configuration and the per-tick bot-calling logic.
+
+Lives outside main.py so it can be used without importing eel
+(e.g. by the headless simulator).
+"""
+import inspect
+import queue
+import threading
+import time
+
+# --- 1. Import ALL bot modules ---
+try:
+    import bots.gemini_bot as gemini_bot
+    import bots.chatgpt_bot as chatgpt_bot
+    import bots.claude_bot as claude_bot
+    import bots.deepseek_bot as deepseek_bot
+    import bots.grok_bot as grok_bot
+    import bots.meta_bot as meta_bot
+    import bots.qwen_bot as qwen_bot
+    import bots.voronoi_bot as voronoi_bot
+    import bots.alphabeta_bot as alphabeta_bot
+    import bots.mcts_bot as mcts_bot
+except ImportError as e:
+    print(f"--- WARNING: Could not import all bots: {e} ---")
+
+# --- 2. Master Bot Configuration ---
+BOT_CONFIG = {
+    'gemini_bot':   {'color': '#4285F4', 'module': gemini_bot},
+    'chatgpt_bot':  {'color': '#75A593', 'module': chatgpt_bot},
+    'claude_bot':   {'color': '#D97A53', 'module': claude_bot},
+    'meta_bot':     {'color': '#0068FA', 'module': meta_bot},
+    'grok_bot':     {'color': '#8A2BE2', 'module': grok_bot},
+    'deepseek_bot': {'color': '#10B981', 'module': deepseek_bot},
+    'qwen_bot':     {'color': '#FF9900', 'module': qwen_bot},
+    'voronoi_bot':  {'color': '#E91E63', 'module': voronoi_bot},
+    'alphabeta_bot': {'color': '#00BCD4', 'module': alphabeta_bot},
+    'mcts_bot':     {'color': '#CDDC39', 'module': mcts_bot},
+}
+AVAILABLE_BOT_NAMES = list(BOT_CONFIG.keys())
+
+
+# --- 3. Bot-Calling Logic ---
+_accepts_cache = {}
+
+
+def _accepts(bot_module, param):
+    get_move = bot_module.get_move
+    key = (get_move, param)
+    if key not in _accepts_cache:
+        try:
+            _accepts_cache[key] = param in inspect.signature(get_move).parameters
+        except (TypeError, ValueError):
+            _accepts_cache[key] = False
+    return _accepts_cache[key]
+
+
+def accepts_board(bot_module):
+    """
+    True if the bot's get_move takes a `board` argument (a game.BoardView).
+    External bots with the old get_move(game_state, player_id) signature
+    keep working, they just don't get the board.
+    """
+    return _accepts(bot_module, 'board')
+
+
+def bot_kwargs(bot_module, board, rng):
+    """
+    The keyword arguments this bot's get_move understands: the shared
+    board, and rng, the player's own random.Random (Game.player_rngs).
+    """
+    kwargs = {}
+    if _accepts(bot_module, 'board'):
+        kwargs['board'] = board
+    if _accepts(bot_module, 'rng'):
+        kwargs['rng'] = rng
+    return kwargs
+
+
+def build_bot_inputs(game, bot_modules):
+    """
+    Returns (game_state, board) for one tick. Decoding every trail into the
+    state dict costs time proportional to the whole board, so it's only
+    done when some bot still has the old signature; otherwise game_state
+    is None and the bots work from the board alone.
+    """
+    board = game.board_view()
+    needs_state = any(m is not None and not accepts_board(m) for m in bot_modules)
+    current_state = game.get_state() if needs_state else None
+    return current_state, board
+
+
+def run_bot_turns(game, bot_modules, metrics=None):
+    """
+    Asks every living bot for its next move and submits it to the game.
+    bot_modules is indexed by player id; None means "not a bot" (e.g. human).
+    The state dict and the BoardView are built once and shared by all bots
+    (see build_bot_inputs).
+    If metrics (a metrics.TickMetrics) is given, the state build and each
+    bot's get_move are timed into it.
+    """
+    if metrics:
+        started = time.perf_counter()
+
+    current_state, board = build_bot_inputs(game, bot_modules)
+
+    if metrics:
+        built = time.perf_counter()
+        metrics.record('get_state', built - started, game.grid_size)
+
+    for i in range(len(bot_modules)):
+        bot_module = bot_modules[i]
+        if bot_module is None:
+            continue
+        if board.alive[i]:
+            if metrics:
+                asked = time.perf_counter()
+            try:
+                kwargs = bot_kwargs(bot_module, board, game.player_rngs[i])
+                move = bot_module.get_move(current_state, i, **kwargs)
+                if move:
+                    game.submit_move(i, move)
+            except Exception as e:
+                print(f"Error getting move from bot {i}: {e}")
+            if metrics:
+                metrics.record_bot(game.players[i].name, time.perf_counter() - asked, game.grid_size)
+
+    if metrics:
+        metrics.record('bots', time.perf_counter() - built, game.grid_size)
+
+
+# --- 4. Move Deadlines ---
+# Bots in this process share one interpreter lock, so runners on
+# different threads (e.g. one per session in main.py) take turns: running
+# their bots side by side would only eat into each other's deadlines
+_turns_lock = threading.Lock()
+
+
+class _BotWorker:
+    """
+    Runs one bot's get_move calls on its own daemon thread, so a call
+    that blows its deadline can be abandoned instead of stalling the tick.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.busy = False
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name=f"bot-{name}", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            func, args, kwargs, reply = job
+            try:
+                result = (func(*args, **kwargs), None)
+            except Exception as e:
+                result = (None, e)
+            # Clear busy first so the next tick never sees a finished call as busy
+            self.busy = False
+            reply.put(result)
+
+    def call(self, timeout, func, *args, **kwargs):
+        """
+        Returns (finished, move, error). If the call takes longer than
+        timeout seconds, finished is False and the result is dropped
+        whenever it does arrive.
+        """
+        reply = queue.Queue(maxsize=1)
+        self.busy = True
+        self._jobs.put((func, args, kwargs, reply))
+        try:
+            move, error = reply.get(timeout=timeout)
+        except queue.Empty:
+            return False, None, None
+        return True, move, error
+
+    def stop(self):
+        self._jobs.put(None)
+
+
+class BotRunner:
+    """
+    Same job as run_bot_turns, but with a per-move time budget.
+
+    With move_timeout set, each bot runs in a worker thread and gets
+    move_timeout seconds to answer. A bot that misses the deadline keeps
+    its current direction for that tick, and the overrun is recorded in
+    self.overruns as {'tick', 'player_id', 'bot'}. A bot still busy with
+    an abandoned move is skipped (and counted as overrunning again)
+    until it finishes. With move_timeout=None bots run inline, no limit.
+    Pass a metrics.TickMetrics as metrics to time each phase and bot.
+    """
+
+    def __init__(self, bot_modules, move_timeout=None, metrics=None):
+        self.bot_modules = bot_modules
+        self.move_timeout = move_timeout
+        self.metrics = metrics
+        self.overruns = []
+        self._workers = {}
+
+    def _worker(self, player_id, name):
+        worker = self._workers.get(player_id)
+        if worker is None:
+            worker = _BotWorker(name)
+            self._workers[player_id] = worker
+        return worker
+
+    def run_turns(self, game):
+        with _turns_lock:
+            self._run_turns(game)
+
+    def _run_turns(self, game):
+        if self.move_timeout is None:
+            run_bot_turns(game, self.bot_modules, self.metrics)
+            return
+
+        metrics = self.metrics
+        if metrics:
+            started = time.perf_counter()
+
+        current_state, board = build_bot_inputs(game, self.bot_modules)
+
+        if metrics:
+            built = time.perf_counter()
+            metrics.record('get_state', built - started, game.grid_size)
+
+        for i in range(len(self.bot_modules)):
+            bot_module = self.bot_modules[i]
+            if bot_module is None or not board.alive[i]:
+                continue
+
+            name = game.players[i].name
+            worker = self._worker(i, name)
+            if worker.busy:
+                self._record_overrun(game, i, name)
+                continue
+
+            if metrics:
+                asked = time.perf_counter()
+            kwargs = bot_kwargs(bot_module, board, game.player_rngs[i])
+            finished, move, error = worker.call(
+                self.move_timeout, bot_module.get_move, current_state, i, **kwargs)
+            if metrics:
+                metrics.record_bot(name, time.perf_counter() - asked, game.grid_size)
+
+            if not finished:
+                self._record_overrun(game, i, name)
+            elif error is not None:
+                print(f"Error getting move from bot {i}: {error}")
+            elif move:
+                game.submit_move(i, move)
+
+        if metrics:
+            metrics.record('bots', time.perf_counter() - built, game.grid_size)
+
+    def _record_overrun(self, game, player_id, name):
+        self.overruns.append({'tick': game.tick, 'player_id': player_id, 'bot': name})
+
+    def close(self):
+        """
+        Stops the worker threads (a busy one exits once its move returns).
+        """
+        for worker in self._workers.values():
+            worker.stop()
+        self._workers = {}
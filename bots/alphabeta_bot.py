@@ -0,0 +1,352 @@
+"""
+Alpha-beta search bot.
+
+Plays the nearest opponent it shares a region with as a two-player game
+(the other players' trails are just walls). Tron moves are simultaneous,
+so each round is searched as "we pick a cell, then the opponent picks,
+knowing it": a cautious reading of the position, and both heads on the
+same cell is a draw. Leaves are scored by Voronoi territory: the cells
+we reach before the opponent, minus the ones it reaches first (out to
+EVAL_RADIUS steps, which only binds on big boards).
+
+The search deepens one round at a time until the work or time budget
+runs out, and plays the best move of the deepest round it finished.
+Positions are Zobrist-hashed into a fixed-size transposition table
+(allocated once per thread, so memory stays bounded) that also
+remembers each position's best move, so every round tries the previous
+round's best line first. Work is counted in nodes plus cells scanned by
+the evaluation, which tracks time closely (see MOVE_TIMEOUT in main.py
+for why it isn't plain time).
+"""
+import random
+import threading
+import time
+from array import array
+from functools import lru_cache
+
+from bots.endgame import endgame_move
+from bots.reach import neighbour_table
+from game import BoardView
+
+# Per-move budgets: work (nodes + cells evaluated; 6000 is about 4 ms),
+# and seconds
+MAX_WORK = 6000
+SEARCH_TIME = 0.008
+MAX_DEPTH = 32
+# Leaves count territory at most this many steps out from each head
+EVAL_RADIUS = 64
+
+WIN = 1_000_000
+DRAW = 0
+
+# Transposition table: TT_SIZE slots (a power of two), indexed by hash
+TT_SIZE = 1 << 15
+EXACT, LOWER, UPPER = 0, 1, 2
+
+_DELTAS = {'UP': (0, -1), 'DOWN': (0, 1), 'LEFT': (-1, 0), 'RIGHT': (1, 0)}
+_OPPOSITE = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
+
+
+@lru_cache(maxsize=4)
+def _zobrist(grid_size):
+    """
+    Three random 64-bit keys per cell: occupied, our head, their head.
+    Seeded, so the same position always hashes the same way.
+    """
+    return array('Q', random.Random(grid_size).randbytes(8 * 3 * grid_size * grid_size))
+
+
+class _Table:
+    """
+    The transposition table, as parallel arrays. A slot holds the full
+    key, search depth, value, bound type and best move (cell index) of
+    one position. Replacement: entries from an older search always give
+    way; within a search, a deeper entry is kept over a shallower one.
+    """
+
+    def __init__(self, size=TT_SIZE):
+        self.mask = size - 1
+        self.keys = array('Q', bytes(8 * size))
+        self.depths = array('b', bytes(size))
+        self.values = array('i', bytes(4 * size))
+        self.flags = array('b', bytes(size))
+        self.moves = array('i', bytes(4 * size))
+        self.ages = array('I', bytes(4 * size))
+        self.age = 0
+
+    def new_search(self):
+        self.age += 1
+
+    def lookup(self, key):
+        slot = key & self.mask
+        if self.keys[slot] == key and self.ages[slot] == self.age:
+            return slot
+        return None
+
+    def store(self, key, depth, value, flag, move):
+        slot = key & self.mask
+        if self.ages[slot] == self.age and self.keys[slot] != key and self.depths[slot] > depth:
+            return
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.values[slot] = value
+        self.flags[slot] = flag
+        self.moves[slot] = move
+        self.ages[slot] = self.age
+
+
+# One table per thread: two searches running at once would clobber each other's entries
+_tables = threading.local()
+
+
+def _thread_table():
+    table = getattr(_tables, 'table', None)
+    if table is None:
+        table = _tables.table = _Table()
+    return table
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+class _Search:
+    """
+    One move's search. grid is a private 0/1 copy of the board that moves
+    are made on and unmade from; me / them are head cell indexes.
+    """
+
+    def __init__(self, board, me, them, max_work, deadline):
+        size = board.grid_size
+        self.size = size
+        cells = board.cells
+        if isinstance(cells, (bytes, bytearray)):
+            self.grid = bytearray(cells)
+        else:
+            self.grid = bytearray(map(bool, cells))
+        self.neighbours = neighbour_table(size)
+        self.keys = _zobrist(size)
+        self.table = _thread_table()
+        self.me = me
+        self.them = them
+        self.hash = self.keys[3 * me + 1] ^ self.keys[3 * them + 2]
+        self.work = 0
+        self.max_work = max_work
+        self.deadline = deadline
+        # Stamps for evaluate(): which side got to a cell first, by level
+        self.stamps = array('I', bytes(4 * size * size))
+        self.sides = bytearray(size * size)
+        self.stamp = 0
+
+    def free_neighbours(self, cell):
+        grid = self.grid
+        return [n for n in self.neighbours[cell] if not grid[n]]
+
+    def evaluate(self):
+        """
+        Cells (within EVAL_RADIUS steps) we reach strictly first, minus
+        the ones the opponent does.
+        """
+        grid = self.grid
+        stamps = self.stamps
+        sides = self.sides
+        neighbours = self.neighbours
+        # One stamp per level: visited means >= base, this level means == stamp
+        base = self.stamp + 1
+        self.stamp += EVAL_RADIUS + 1
+        stamps[self.me] = stamps[self.them] = base
+        ours = [self.me]
+        theirs = [self.them]
+        score = 0
+        for level in range(1, EVAL_RADIUS + 1):
+            stamp = base + level
+            next_ours = []
+            for cell in ours:
+                for n in neighbours[cell]:
+                    if not grid[n] and stamps[n] < base:
+                        stamps[n] = stamp
+                        sides[n] = 1
+                        next_ours.append(n)
+                        score += 1
+            next_theirs = []
+            for cell in theirs:
+                for n in neighbours[cell]:
+                    if grid[n]:
+                        continue
+                    if stamps[n] < base:
+                        stamps[n] = stamp
+                        sides[n] = 2
+                        next_theirs.append(n)
+                        score -= 1
+                    elif stamps[n] == stamp and sides[n] == 1:
+                        sides[n] = 0  # Same distance: contested, nobody's
+                        score -= 1
+            self.work += len(next_ours) + len(next_theirs)
+            if not next_ours and not next_theirs:
+                break
+            ours = next_ours
+            theirs = next_theirs
+        return score
+
+    def tick(self):
+        self.work += 1
+        if self.work >= self.max_work or time.perf_counter() > self.deadline:
+            raise _OutOfBudget()
+
+    def ours(self, depth, alpha, beta):
+        """
+        Our turn, `depth` rounds to go. Returns the value for us.
+        """
+        self.tick()
+        table = self.table
+        key = self.hash
+        best_cell = -1
+        slot = table.lookup(key)
+        if slot is not None:
+            best_cell = table.moves[slot]
+            if table.depths[slot] >= depth:
+                value, flag = table.values[slot], table.flags[slot]
+                if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+                    return value
+
+        moves = self.free_neighbours(self.me)
+        if not moves:
+            # We crash; a draw if they're stuck too
+            return DRAW if not self.free_neighbours(self.them) else -WIN + MAX_DEPTH - depth
+        if depth == 0:
+            value = self.evaluate()
+            table.store(key, 0, value, EXACT, -1)
+            return value
+        if best_cell in moves:
+            moves.remove(best_cell)
+            moves.insert(0, best_cell)
+
+        start_alpha = alpha
+        best = -WIN - 1
+        for cell in moves:
+            value = self.theirs(depth, alpha, beta, cell)
+            if value > best:
+                best = value
+                best_cell = cell
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+        flag = LOWER if best >= beta else UPPER if best <= start_alpha else EXACT
+        table.store(key, depth, best, flag, best_cell)
+        return best
+
+    def theirs(self, depth, alpha, beta, our_cell):
+        """
+        The opponent answers our move to our_cell; then the round is played.
+        """
+        self.tick()
+        replies = self.free_neighbours(self.them)
+        if not replies:
+            return WIN - MAX_DEPTH + depth  # They crash, we don't
+        grid = self.grid
+        keys = self.keys
+        me, them = self.me, self.them
+        best = WIN + 1
+        for cell in replies:
+            if cell == our_cell:
+                value = DRAW  # Head-on
+            else:
+                # Make the round, search on, unmake it
+                grid[our_cell] = grid[cell] = 1
+                saved_hash = self.hash
+                self.hash ^= (keys[3 * me + 1] ^ keys[3 * our_cell + 1] ^ keys[3 * our_cell]
+                              ^ keys[3 * them + 2] ^ keys[3 * cell + 2] ^ keys[3 * cell])
+                self.me, self.them = our_cell, cell
+                try:
+                    value = self.ours(depth - 1, alpha, beta)
+                finally:
+                    self.me, self.them = me, them
+                    self.hash = saved_hash
+                    grid[our_cell] = grid[cell] = 0
+            if value < best:
+                best = value
+            if best < beta:
+                beta = best
+            if alpha >= beta:
+                break
+        return best
+
+    def root(self):
+        """
+        Iterative deepening. Returns (best cell, its value) from the
+        deepest round finished, or (None, None) if not even one was.
+        Each round tries the previous round's best move first.
+        """
+        self.table.new_search()
+        moves = self.free_neighbours(self.me)
+        best = (None, None)
+        for depth in range(1, MAX_DEPTH + 1):
+            alpha = -WIN - 1
+            round_best = None
+            try:
+                for cell in moves:
+                    value = self.theirs(depth, alpha, WIN + 1, cell)
+                    if round_best is None or value > alpha:
+                        alpha = value
+                        round_best = cell
+            except _OutOfBudget:
+                break
+            best = (round_best, alpha)
+            moves.remove(round_best)
+            moves.insert(0, round_best)
+            if abs(alpha) >= WIN - MAX_DEPTH:
+                break  # Forced win or loss: searching deeper won't change it
+        return best
+
+
+def get_move(game_state, player_id, board=None, rng=None,
+             max_work=MAX_WORK, search_time=SEARCH_TIME):
+    """
+    Alpha-Beta Bot: searches ahead against the nearest opponent in its
+    region; walled in alone, plays the endgame (bots.endgame).
+    """
+    started = time.perf_counter()
+    if board is None:
+        board = BoardView.from_state(game_state)
+    if rng is None:
+        rng = random
+    if not board.alive[player_id]:
+        return None
+
+    x, y = board.heads[player_id]
+    size = board.grid_size
+    current_direction = board.directions[player_id]
+
+    moves = {}
+    for move, (dx, dy) in _DELTAS.items():
+        nx, ny = x + dx, y + dy
+        if move != _OPPOSITE[current_direction] and board.is_free(nx, ny):
+            moves[ny * size + nx] = move
+    if not moves:
+        return current_direction
+
+    # Nobody can reach us any more: it's a longest-path puzzle now
+    move = endgame_move(board, player_id)
+    if move is not None:
+        return move
+
+    # The nearest living opponent whose head touches one of our regions
+    our_regions = {board.region_labels[cell] for cell in moves}
+    touching = board.region_heads()
+    rivals = {pid for label in our_regions for pid in touching.get(label, ()) if pid != player_id}
+    if rivals:
+        ox, oy = min((board.heads[pid] for pid in rivals),
+                     key=lambda head: abs(head[0] - x) + abs(head[1] - y))
+        search = _Search(board, y * size + x, oy * size + ox, max_work, started + search_time)
+        cell, _ = search.root()
+        if cell in moves:
+            return moves[cell]
+
+    # Alone (or out of time before the first round): most space, straight on ties
+    best = max(board.region_size(cell % size, cell // size) for cell in moves)
+    best_moves = [move for cell, move in moves.items()
+                  if board.region_size(cell % size, cell // size) == best]
+    if current_direction in best_moves:
+        return current_direction
+    return rng.choice(best_moves)
@@ -0,0 +1,121 @@
+"""
+Chamber analysis: how much of a pocket a bot can actually fill.
+
+A flood fill counts every free cell behind a move, but a path can't
+always visit them all. Where a pocket splits into rooms joined by a
+single cell (an articulation point), a path that goes into one room
+never comes back for the other. And on a checkerboard every step
+changes colour, so a room with more cells of one colour than the other
+can't be filled completely either.
+
+fillable() finds the articulation points of the free cells around a
+start cell with Tarjan's algorithm (an iterative depth-first search),
+which splits them into biconnected chambers. It then
+walks the chamber tree from the leaves up: the best a path entering a chamber can do is
+its parity bound for that chamber (2 * the smaller colour count, +1 if
+it starts on the bigger colour), plus the best chamber hanging off any
+of its articulation points. That's an estimate, not an exact longest
+path (which is NP-hard), but it never counts two dead-end rooms at once.
+
+Cost stays bounded on big boards: move_spaces() only runs the analysis
+for moves into pockets smaller than CHAMBER_LIMIT cells, found from the
+board's region index in O(1). Open space is scored by its region size
+as before, so the extra work only ever happens around a head in a
+pocket, and is at most three searches of under CHAMBER_LIMIT cells.
+
+Example:
+    rooms = move_spaces(board, x, y)  # {(nx, ny): room} instead of region_size
+"""
+from bots.reach import neighbour_table
+
+# Pockets this big or bigger count as open space (no chamber analysis)
+CHAMBER_LIMIT = 256
+
+
+def _parity_bound(grid_size, cells, entry_colour):
+    """
+    Most of `cells` (all in one chamber) a path can visit when its first
+    cell has colour entry_colour ((x + y) % 2).
+    """
+    same = sum(1 for cell in cells if (cell // grid_size + cell % grid_size) & 1 == entry_colour)
+    other = len(cells) - same
+    return 2 * other + 1 if same > other else 2 * same
+
+
+def fillable(grid_size, cells, start):
+    """
+    Estimated number of free cells a path starting on `start` (a free
+    cell index into the flat occupancy grid `cells`) can visit, start
+    included. It searches every cell the start can reach, so callers
+    only use it inside small pockets.
+    """
+    neighbours = neighbour_table(grid_size)
+    order = {start: 0}  # Discovery order
+    low = {start: 0}
+    chambers = []       # (articulation point or start, the chamber's other cells)
+    stack = []          # Cells whose chamber hasn't been closed yet
+    # Depth-first search with an explicit stack of (cell, iterator over its neighbours)
+    walk = [(start, iter(neighbours[start]))]
+    while walk:
+        cell, pending = walk[-1]
+        for n in pending:
+            if cells[n]:
+                continue
+            seen = order.get(n)
+            if seen is None:
+                order[n] = low[n] = len(order)
+                stack.append(n)
+                walk.append((n, iter(neighbours[n])))
+                break
+            if seen < low[cell]:
+                low[cell] = seen
+        else:
+            walk.pop()
+            if not walk:
+                break
+            parent = walk[-1][0]
+            if low[cell] < low[parent]:
+                low[parent] = low[cell]
+            if low[cell] >= order[parent]:
+                # parent cuts everything from `cell` on off from the rest
+                members = []
+                while True:
+                    member = stack.pop()
+                    members.append(member)
+                    if member == cell:
+                        break
+                chambers.append((parent, members))
+
+    # Chambers come out deepest first, so every chamber hanging off one
+    # of a chamber's cells has been scored before the chamber itself.
+    # best_from[c]: the best a path can do after reaching cell c.
+    best_from = {}
+    for top, members in chambers:
+        if len(members) == 1:
+            # A corridor cell: always fillable (it's next to top, so the other colour)
+            score = 1 + best_from.get(members[0], 0)
+        else:
+            entry_colour = ((top // grid_size + top % grid_size) & 1) ^ 1
+            score = _parity_bound(grid_size, members, entry_colour)
+            score += max([best_from[member] for member in members if member in best_from], default=0)
+        if score > best_from.get(top, 0):
+            best_from[top] = score
+    return 1 + best_from.get(start, 0)
+
+
+def move_spaces(board, x, y, limit=CHAMBER_LIMIT):
+    """
+    {(nx, ny): room} for every free cell next to (x, y): how much room
+    stepping there leaves. That's the region size in open space, and
+    the fillable() estimate in a pocket smaller than `limit` cells.
+    """
+    size = board.grid_size
+    rooms = {}
+    for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+        region = board.region_size(nx, ny)
+        if not region:
+            continue
+        if region < limit:
+            region = fillable(size, board.cells, ny * size + nx)
+        rooms[(nx, ny)] = region
+    return rooms
@@ -1,37 +1,26 @@
 import random
-from collections import deque
 
-def get_move(game_state, player_id):
+from game import BoardView
+
+def get_move(game_state, player_id, board=None, rng=None):
     """
     A safer Tron bot that avoids walls, trails, and dead-ends by
     ranking moves by their flood-fill (open space) score.
     """
 
-    player = game_state['players'][player_id]
-    if not player['is_alive']:
+    # --- Shared board (built here for old-style callers) ---
+    if board is None:
+        board = BoardView.from_state(game_state)
+    # --- Own random stream (global random for old-style callers) ---
+    if rng is None:
+        rng = random
+    if not board.alive[player_id]:
         return None
 
-    x = player['x']
-    y = player['y']
-    grid_size = game_state['grid_size']
-
-    # --- Build occupied set ---
-    occupied = set()
-    for p in game_state['players']:
-        for (tx, ty) in p['trail']:
-            occupied.add((tx, ty))
+    x, y = board.heads[player_id]
 
-    # --- Determine current direction ---
-    if len(player['trail']) < 2:
-        current_dir = random.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
-    else:
-        hx, hy = player['trail'][-1]
-        px, py = player['trail'][-2]
-        dx, dy = hx - px, hy - py
-        if dx == 1: current_dir = 'RIGHT'
-        elif dx == -1: current_dir = 'LEFT'
-        elif dy == 1: current_dir = 'DOWN'
-        else: current_dir = 'UP'
+    # --- Current direction ---
+    current_dir = board.directions[player_id]
 
     # --- Move deltas ---
     DIRS = {
@@ -46,31 +35,13 @@ def get_move(game_state, player_id):
     possible_moves = [m for m in DIRS if m != opposite[current_dir]]
 
     # --- Check valid cell ---
-    def safe(nx, ny):
-        if not (0 <= nx < grid_size and 0 <= ny < grid_size):
-            return False
-        if (nx, ny) in occupied:
-            return False
-        return True
+    safe = board.is_free
 
-    # --- Flood-fill to estimate open space ---
+    # --- Open space from the board's region index (capped at 151 like the old flood fill) ---
     def flood_score(start):
         if not safe(*start):
             return -1
-        seen = {start}
-        q = deque([start])
-        count = 0
-        while q:
-            cx, cy = q.popleft()
-            count += 1
-            for dx, dy in DIRS.values():
-                nx, ny = cx + dx, cy + dy
-                if (nx, ny) not in seen and safe(nx, ny):
-                    seen.add((nx, ny))
-                    q.append((nx, ny))
-            if count > 150:  # Limit for speed
-                break
-        return count
+        return min(board.region_size(*start), 151)
 
     # --- Evaluate moves ---
     move_scores = []
@@ -88,7 +59,7 @@ def get_move(game_state, player_id):
     best_score = max(score for score, _ in move_scores)
     best_moves = [m for s, m in move_scores if s == best_score]
 
-    if current_dir in best_moves and random.random() < 0.6:
+    if current_dir in best_moves and rng.random() < 0.6:
         return current_dir
 
-    return random.choice(best_moves)
+    return rng.choice(best_moves)
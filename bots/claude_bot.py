@@ -1,66 +1,34 @@
-from collections import deque
+from bots.reach import reach_for
+from game import BoardView
 
-def get_move(game_state, player_id):
+def get_move(game_state, player_id, board=None):
     """
     Advanced Tron bot using flood fill and spatial awareness.
     """
-    player = game_state['players'][player_id]
-    if not player['is_alive']:
+    # Shared board (built here for old-style callers)
+    if board is None:
+        board = BoardView.from_state(game_state)
+    if not board.alive[player_id]:
         return None
 
-    x = player['x']
-    y = player['y']
-    grid_size = game_state['grid_size']
-
-    # Build occupied set
-    occupied = set()
-    for p in game_state['players']:
-        for (tx, ty) in p['trail']:
-            occupied.add((tx, ty))
+    x, y = board.heads[player_id]
+    grid_size = board.grid_size
 
     # Get current direction
-    current_direction = 'UP'
-    if len(player['trail']) >= 2:
-        last_pos = player['trail'][-1]
-        prev_pos = player['trail'][-2]
-        dx = last_pos[0] - prev_pos[0]
-        dy = last_pos[1] - prev_pos[1]
-        
-        if dx == 1: current_direction = 'RIGHT'
-        elif dx == -1: current_direction = 'LEFT'
-        elif dy == 1: current_direction = 'DOWN'
-        elif dy == -1: current_direction = 'UP'
+    current_direction = board.directions[player_id]
 
     # Helper: check if position is valid
-    def is_safe(check_x, check_y):
-        if not (0 <= check_x < grid_size and 0 <= check_y < grid_size):
-            return False
-        return (check_x, check_y) not in occupied
+    is_safe = board.is_free
+    cells = board.cells
+    size = grid_size
+
+    # Flood fill to count reachable spaces (shared engine, see bots/reach.py)
+    reach = reach_for(grid_size)
 
-    # Flood fill to count reachable spaces
     def flood_fill(start_x, start_y, max_depth=20):
         if not is_safe(start_x, start_y):
             return 0
-        
-        visited = set()
-        queue = deque([(start_x, start_y, 0)])
-        visited.add((start_x, start_y))
-        count = 0
-        
-        while queue:
-            cx, cy, depth = queue.popleft()
-            count += 1
-            
-            if depth >= max_depth:
-                continue
-            
-            for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-                nx, ny = cx + dx, cy + dy
-                if (nx, ny) not in visited and is_safe(nx, ny):
-                    visited.add((nx, ny))
-                    queue.append((nx, ny, depth + 1))
-        
-        return count
+        return reach.count(cells, start_y * size + start_x, max_depth=max_depth)
 
     # Get valid moves (no 180-degree turns)
     possible_moves = ['UP', 'DOWN', 'LEFT', 'RIGHT']
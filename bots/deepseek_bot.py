@@ -1,57 +1,42 @@
 import random
-from collections import deque
 
-def get_move(game_state, player_id):
-    player = game_state['players'][player_id]
-    if not player['is_alive']:
-        return random.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
+from bots.reach import reach_for
+from game import BoardView
+
+def get_move(game_state, player_id, board=None, rng=None):
+    # Shared board (built here for old-style callers)
+    if board is None:
+        board = BoardView.from_state(game_state)
+    # Seeded random stream for this player, so games replay exactly
+    if rng is None:
+        rng = random
+    if not board.alive[player_id]:
+        return rng.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
     
-    grid_size = game_state['grid_size']
-    x, y = player['x'], player['y']
+    grid_size = board.grid_size
+    cells = board.cells
+    size = grid_size
+    x, y = board.heads[player_id]
     
-    # Build occupied set and opponent positions
-    occupied = set()
-    opponents = []
-    for p in game_state['players']:
-        if p['is_alive']:
-            for pos in p['trail']:
-                occupied.add(pos)
-            if p['id'] != player_id:
-                opponents.append((p['x'], p['y']))
+    # Opponent positions
+    opponents = [
+        board.heads[pid] for pid in range(len(board.heads))
+        if board.alive[pid] and pid != player_id
+    ]
     
-    # Determine current direction
-    current_direction = 'UP'
-    if len(player['trail']) >= 2:
-        last_x, last_y = player['trail'][-1]
-        prev_x, prev_y = player['trail'][-2]
-        dx, dy = last_x - prev_x, last_y - prev_y
-        if dx == 1: current_direction = 'RIGHT'
-        elif dx == -1: current_direction = 'LEFT'
-        elif dy == 1: current_direction = 'DOWN'
-        elif dy == -1: current_direction = 'UP'
+    # Current direction
+    current_direction = board.directions[player_id]
     
+    reach = reach_for(grid_size)
+
     # Check if a move is safe
     def is_safe(nx, ny, depth=1):
-        if not (0 <= nx < grid_size and 0 <= ny < grid_size):
-            return False
-        if (nx, ny) in occupied:
+        if not board.is_free(nx, ny):
             return False
         
         # Simple flood fill to check future mobility
         if depth > 0:
-            visited = set()
-            queue = deque([(nx, ny)])
-            visited.add((nx, ny))
-            count = 0
-            while queue and count < 10:
-                cx, cy = queue.popleft()
-                count += 1
-                for dx, dy in [(0,1), (0,-1), (1,0), (-1,0)]:
-                    nx2, ny2 = cx + dx, cy + dy
-                    if (0 <= nx2 < grid_size and 0 <= ny2 < grid_size and 
-                        (nx2, ny2) not in occupied and (nx2, ny2) not in visited):
-                        visited.add((nx2, ny2))
-                        queue.append((nx2, ny2))
+            count = reach.count(cells, ny * size + nx, limit=10)
             if count < 5:  # Limited space ahead
                 return False
                 
@@ -108,7 +93,7 @@ def get_move(game_state, player_id):
     best_moves = [move for move, score in move_scores.items() if score == best_score]
     
     if best_moves:
-        return random.choice(best_moves)
+        return rng.choice(best_moves)
     
     # If no safe moves, try any non-180 move
     for move in possible_moves:
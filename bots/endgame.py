@@ -0,0 +1,241 @@
+"""
+Endgame play for a player walled in on its own.
+
+Once no other living head touches the regions around ours, nothing can
+happen to us but running out of room. The game is then a single-player
+longest-path problem, and endgame_move() plays it:
+
+- Up to EXACT_LIMIT free cells, it plans a whole path with a
+  branch-and-bound depth-first search over (cell, visited cells as a
+  bitmask) states. States are memoized so each is searched once. Moves
+  are tried fewest-exits first (Warnsdorff's rule), so the first path
+  found is already a good one. A branch is cut when the cells it can
+  still reach can't beat the best path. Chamber estimates
+  (bots.chambers) bound each first move, so the search stops as soon
+  as it reaches one. It's exact if it finishes within its budget, and
+  the best path found so far if it doesn't.
+- The plan is followed on later moves. It's kept in the game's
+  board.memo, so it never outlives the game or leaks into another. A
+  plan is only used if the head is where it expects, the region around
+  it is the size it expects and its cells are all still free; anything
+  unexpected means a re-plan.
+- Bigger regions get a heuristic every move: the move with the best
+  chamber estimate (region size in open space, see move_spaces), then
+  the one that hugs the walls most.
+
+The search budget counts states (MAX_NODES); SEARCH_TIME only stops it
+if those run slow (see MOVE_TIMEOUT in main.py).
+
+Example:
+    move = endgame_move(board, player_id)
+    if move is not None:
+        return move  # We're on our own: play the endgame
+"""
+import time
+
+from bots.chambers import fillable, move_spaces
+from bots.reach import neighbour_table
+
+# Regions up to this many cells get a planned path
+EXACT_LIMIT = 64
+# Budgets for planning: states (500 is at most about 6 ms, and finds the
+# optimal path in most regions this small), and seconds
+MAX_NODES = 500
+SEARCH_TIME = 0.008
+
+
+class _StopSearch(Exception):
+    pass
+
+
+def _direction(grid_size, head, cell):
+    step = cell - head
+    if step == -grid_size:
+        return 'UP'
+    if step == grid_size:
+        return 'DOWN'
+    return 'LEFT' if step == -1 else 'RIGHT'
+
+
+def is_isolated(board, player_id):
+    """
+    True if player_id is alive, can still move, and no other living
+    head touches any region next to its head.
+    """
+    if not board.alive[player_id]:
+        return False
+    size = board.grid_size
+    x, y = board.heads[player_id]
+    labels = {board.region_labels[ny * size + nx]
+              for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y))
+              if board.is_free(nx, ny)}
+    if not labels:
+        return False
+    touching = board.region_heads()
+    return all(pid == player_id for label in labels for pid in touching.get(label, ()))
+
+
+def longest_path(grid_size, cells, head, max_nodes=MAX_NODES, deadline=None):
+    """
+    The longest path from head (a cell index) over the free cells of the
+    flat occupancy grid: the list of cells after head, in order. Exact
+    if the search finishes within max_nodes states (and the deadline),
+    else the longest one found by then.
+    """
+    neighbours = neighbour_table(grid_size)
+    # Number the free cells head can reach, so a set of them fits in an int
+    index = {}
+    queue = []
+    for n in neighbours[head]:
+        if not cells[n] and n not in index:
+            index[n] = len(queue)
+            queue.append(n)
+    for cell in queue:
+        for n in neighbours[cell]:
+            if not cells[n] and n not in index:
+                index[n] = len(queue)
+                queue.append(n)
+    links = [sum(1 << index[n] for n in neighbours[cell] if n in index) for cell in queue]
+    everything = (1 << len(queue)) - 1
+
+    def reachable(i, free):
+        """
+        How many of the `free` cells a path standing on i can get to.
+        """
+        found = 0
+        frontier = links[i] & free
+        while frontier:
+            found |= frontier
+            grown = 0
+            while frontier:
+                low = frontier & -frontier
+                grown |= links[low.bit_length() - 1]
+                frontier ^= low
+            frontier = grown & free & ~found
+        return found.bit_count()
+
+    # Chamber estimates bound each first move (and so the whole search)
+    starts = sorted(((fillable(grid_size, cells, cell), index[cell])
+                     for cell in neighbours[head] if cell in index), reverse=True)
+    best = []
+    path = []
+    seen = set()  # (cell, visited) states already searched
+    nodes = 0
+
+    def search(i, visited, bound):
+        nonlocal best, nodes
+        if len(path) > len(best):
+            best = path[:]
+            if len(best) == bound:
+                raise _StopSearch()  # Can't do better: done
+        if (i, visited) in seen:
+            return
+        seen.add((i, visited))
+        nodes += 1
+        if nodes > max_nodes or (deadline is not None and nodes & 63 == 0
+                                 and time.perf_counter() > deadline):
+            raise _StopSearch()
+        free = everything & ~visited
+        if len(path) + reachable(i, free) <= len(best):
+            return
+        # Fewest ways on first (Warnsdorff's rule): walls get hugged, holes don't get left
+        moves = []
+        options = links[i] & free
+        while options:
+            low = options & -options
+            options ^= low
+            j = low.bit_length() - 1
+            moves.append(((links[j] & free).bit_count(), j))
+        moves.sort()
+        for _, j in moves:
+            path.append(j)
+            search(j, visited | 1 << j, bound)
+            path.pop()
+
+    try:
+        for bound, i in starts:
+            if bound <= len(best):
+                break
+            path = [i]
+            search(i, 1 << i, bound)
+    except _StopSearch:
+        pass
+    return [queue[i] for i in best]
+
+
+def _heuristic_move(board, x, y):
+    """
+    The next cell by chamber estimate (bots.chambers.move_spaces), then
+    by fewest free cells around it (hugging the walls); None if boxed in.
+    """
+    size = board.grid_size
+    cells = board.cells
+    neighbours = neighbour_table(size)
+    head = y * size + x
+    best_key, best_cell = None, None
+    for (nx, ny), room in move_spaces(board, x, y).items():
+        cell = ny * size + nx
+        exits = sum(1 for n in neighbours[cell] if not cells[n] and n != head)
+        key = (room, -exits, -cell)
+        if best_key is None or key > best_key:
+            best_key, best_cell = key, cell
+    return best_cell
+
+
+def _room(board, head):
+    """
+    Free cells in the regions next to head (a cell index).
+    """
+    labels = {board.region_labels[n] for n in neighbour_table(board.grid_size)[head]
+              if not board.cells[n]}
+    return sum(board.region_sizes.get(label, 0) for label in labels)
+
+
+def _plans(board):
+    """
+    Plans being followed in this game: player id -> (head cell it
+    expects next, room there, [cells still to visit]).
+    """
+    return board.memo.setdefault('endgame', {})
+
+
+def _follow(board, player_id, path):
+    """
+    Files the rest of `path` for player_id, to pick up once it stands on
+    the path's first cell, and returns that cell.
+    """
+    step = path[0]
+    # Stepping in leaves everything else in its region, and nothing more
+    room = board.region_sizes.get(board.region_labels[step], 0) - 1
+    _plans(board)[player_id] = (step, room, path[1:])
+    return step
+
+
+def endgame_move(board, player_id, max_nodes=MAX_NODES, search_time=SEARCH_TIME):
+    """
+    The move ('UP', ...) for a player no opponent can reach any more,
+    or None if it isn't isolated (or has no move left).
+    """
+    if not is_isolated(board, player_id):
+        return None
+    size = board.grid_size
+    cells = board.cells
+    x, y = board.heads[player_id]
+    head = y * size + x
+    room = _room(board, head)
+
+    # Still on plan? Then the rest of it is as good as it was
+    plan = _plans(board).pop(player_id, None)
+    if plan is not None:
+        plan_head, plan_room, path = plan
+        if (plan_head == head and plan_room == room and path
+                and not any(cells[c] for c in path)):
+            return _direction(size, head, _follow(board, player_id, path))
+
+    if room <= EXACT_LIMIT:
+        path = longest_path(size, cells, head, max_nodes, time.perf_counter() + search_time)
+        if path:
+            return _direction(size, head, _follow(board, player_id, path))
+
+    cell = _heuristic_move(board, x, y)
+    return None if cell is None else _direction(size, head, cell)
@@ -1,36 +1,21 @@
 import random
-from collections import deque
 
-def get_move(game_state, player_id):
-    player = game_state['players'][player_id]
-    if not player['is_alive']:
-        return None
+from game import BoardView
 
-    x = player['x']
-    y = player['y']
-    grid_size = game_state['grid_size']
+def get_move(game_state, player_id, board=None, rng=None):
+    # Shared board (built here for old-style callers)
+    if board is None:
+        board = BoardView.from_state(game_state)
+    # Random stream for tie-breaks
+    if rng is None:
+        rng = random
+    if not board.alive[player_id]:
+        return None
 
-    # Build a set of all occupied coordinates
-    occupied = set()
-    for p in game_state['players']:
-        for (tx, ty) in p['trail']:
-            occupied.add((tx, ty))
+    x, y = board.heads[player_id]
 
     # Get current direction
-    current_direction_str = None
-    if len(player['trail']) >= 2:
-        prev_pos = player['trail'][-2]
-        last_pos = player['trail'][-1]
-        dx = last_pos[0] - prev_pos[0]
-        dy = last_pos[1] - prev_pos[1]
-        if dx == 1:
-            current_direction_str = 'RIGHT'
-        elif dx == -1:
-            current_direction_str = 'LEFT'
-        elif dy == 1:
-            current_direction_str = 'DOWN'
-        elif dy == -1:
-            current_direction_str = 'UP'
+    current_direction_str = board.directions[player_id]
 
     # Possible moves, avoiding 180-degree turn if direction exists
     possible_moves = ['UP', 'DOWN', 'LEFT', 'RIGHT']
@@ -44,23 +29,12 @@ def get_move(game_state, player_id):
         possible_moves.remove('LEFT')
 
     # Helper to check if a position is safe
-    def is_safe(check_x, check_y):
-        return 0 <= check_x < grid_size and 0 <= check_y < grid_size and (check_x, check_y) not in occupied
+    is_safe = board.is_free
 
-    # Flood fill to compute reachable space
-    def flood_fill(start_x, start_y, occupied, grid_size):
-        q = deque([(start_x, start_y)])
-        visited = set([(start_x, start_y)])
-        count = 1
-        while q:
-            cx, cy = q.popleft()
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = cx + dx, cy + dy
-                if 0 <= nx < grid_size and 0 <= ny < grid_size and (nx, ny) not in occupied and (nx, ny) not in visited:
-                    visited.add((nx, ny))
-                    q.append((nx, ny))
-                    count += 1
-        return count
+    # Reachable space: the size of the free region a cell belongs to,
+    # looked up from the board's region index instead of flood filling
+    def flood_fill(start_x, start_y):
+        return board.region_size(start_x, start_y)
 
     # Evaluate each possible move
     move_scores = {}
@@ -74,7 +48,7 @@ def get_move(game_state, player_id):
         elif move == 'RIGHT':
             new_x, new_y = x + 1, y
         if is_safe(new_x, new_y):
-            score = flood_fill(new_x, new_y, occupied, grid_size)
+            score = flood_fill(new_x, new_y)
         else:
             score = 0
         move_scores[move] = score
@@ -88,4 +62,4 @@ def get_move(game_state, player_id):
         return current_direction_str
 
     # Otherwise, choose randomly among best
-    return random.choice(best_moves)
\ No newline at end of file
+    return rng.choice(best_moves)
\ No newline at end of file
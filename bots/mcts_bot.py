@@ -0,0 +1,266 @@
+"""
+Monte Carlo tree search bot.
+
+Plays out the fight with the opponents it shares a region with (up to
+MAX_RIVALS of them, nearest first; everyone else's trail is a wall) a
+few dozen times per move (MAX_WORK simulated player moves, a playout
+lasting up to ROLLOUT_ROUNDS rounds) and moves where those games went
+best. Each playout walks down the tree picking our moves by UCB1, adds
+one new node, then plays on with a cheap rollout policy for everybody:
+a random free neighbour, avoiding dead ends when there's a choice. All
+players move at once, heads meeting on a cell crash both, exactly as in
+Game.update().
+
+The tree only branches on our moves; the opponents' moves are sampled
+afresh in every playout ("open loop"), so a node stands for a sequence
+of our moves and its statistics average over what the opponents might
+do. Playouts run on a private 0/1 copy of the board (a bytearray reset
+by one slice assignment) with neighbours from bots.reach, so there are
+no game_state dicts or Game objects in the loop.
+
+The budget counts work (player moves simulated) rather than time, as
+for the other searching bots (see MOVE_TIMEOUT in main.py). With a
+concurrent.futures.ProcessPoolExecutor as `pool`, get_move runs one
+independent tree per worker, each with its share of the work, and adds
+up their root statistics (root parallelism). In a
+game the BotPool already runs the bots in parallel (and its daemonic
+workers can't start processes of their own), so the pool is for
+headless runs, e.g. benchmark.py --mcts.
+"""
+import math
+import random
+import time
+
+from bots.endgame import endgame_move
+from bots.reach import neighbour_table
+from game import BoardView
+
+# Per-move budgets: work (player moves simulated; 2500 is about 5 ms),
+# and seconds
+MAX_WORK = 2500
+SEARCH_TIME = 0.008
+# Playout scores. One that gets ROLLOUT_ROUNDS rounds in without a
+# result counts as even; crashing out together scores lower, since an
+# undecided game can still be won
+ROLLOUT_ROUNDS = 40
+UNDECIDED = 0.5
+CRASH_DRAW = 0.25
+# UCB1 exploration constant
+EXPLORATION = 1.0
+# Opponents played out with us; the rest are left where they are
+MAX_RIVALS = 2
+
+_DELTAS = {'UP': (0, -1), 'DOWN': (0, 1), 'LEFT': (-1, 0), 'RIGHT': (1, 0)}
+_OPPOSITE = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
+
+
+class _Node:
+    """
+    A sequence of our moves: children by the cell our next move goes to,
+    and the playouts through here with their total score (1 per win,
+    less for draws, nothing for losses).
+    """
+    __slots__ = ('children', 'visits', 'wins')
+
+    def __init__(self):
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0
+
+
+def search(grid_size, cells, heads, max_work, seed, search_time, first_moves=None):
+    """
+    Builds a tree from this position, playing out games until max_work
+    player moves have been simulated (or search_time seconds are up).
+    cells is the occupancy grid (anything non-zero is taken), heads the
+    head cell indexes of the players in the fight, ours first;
+    first_moves limits the cells our first move may go to. Returns
+    {cell of our first move: (visits, score)}; a module-level function
+    so pool workers can run it.
+    """
+    deadline = time.perf_counter() + search_time
+    neighbours = neighbour_table(grid_size)
+    base = bytes(cells) if isinstance(cells, (bytes, bytearray)) else bytes(map(bool, cells))
+    grid = bytearray(base)
+    rng = random.Random(seed)
+    count = len(heads)
+    root = _Node()
+
+    random_fraction = rng.random
+
+    work = 0
+    while work < max_work:
+        if time.perf_counter() > deadline:
+            break
+        grid[:] = base
+        positions = list(heads)
+        alive = [True] * count
+        targets = [None] * count
+        node = root
+        path = [root]
+        in_tree = True
+        score = UNDECIDED
+        for _ in range(ROLLOUT_ROUNDS):
+            work += count
+            for i in range(count):
+                if not alive[i]:
+                    targets[i] = None
+                    continue
+                head = positions[i]
+                if i == 0 and in_tree:
+                    if node is root and first_moves is not None:
+                        options = first_moves
+                    else:
+                        options = [n for n in neighbours[head] if not grid[n]]
+                    # --- Our move, down the tree: a new node, or the best by UCB1 ---
+                    target = None
+                    if options:
+                        children = node.children
+                        untried = [cell for cell in options if cell not in children]
+                        if untried:
+                            target = untried[int(random_fraction() * len(untried))]
+                            node = children[target] = _Node()
+                            in_tree = False
+                        else:
+                            spread = EXPLORATION * math.sqrt(math.log(node.visits))
+                            best = -1.0
+                            for cell in options:
+                                child = children[cell]
+                                value = child.wins / child.visits + spread / math.sqrt(child.visits)
+                                if value > best:
+                                    best = value
+                                    target = cell
+                            node = children[target]
+                        path.append(node)
+                    targets[0] = target
+                    continue
+
+                # --- Rollout policy: a random free neighbour, not a dead end if avoidable ---
+                # Looks round the neighbours from a random one; the first free
+                # cell that leads somewhere wins, else the first free one
+                around = neighbours[head]
+                choices = len(around)
+                first = int(random_fraction() * choices)
+                target = None
+                for step in range(choices):
+                    cell = around[(first + step) % choices]
+                    if grid[cell]:
+                        continue
+                    if target is None:
+                        target = cell
+                    for onward in neighbours[cell]:
+                        if not grid[onward] and onward != head:
+                            break
+                    else:
+                        continue
+                    target = cell
+                    break
+                targets[i] = target
+
+            # --- The round plays out as in Game.update(): head-on crashes both ---
+            for i in range(count):
+                if alive[i] and (targets[i] is None or targets.count(targets[i]) > 1):
+                    alive[i] = False
+            for i in range(count):
+                if alive[i]:
+                    grid[targets[i]] = 1
+                    positions[i] = targets[i]
+
+            rivals_alive = alive[1] if count == 2 else any(alive[1:])
+            if not alive[0]:
+                score = 0.0 if rivals_alive else CRASH_DRAW
+                break
+            if not rivals_alive:
+                score = 1.0
+                break
+
+        for node in path:
+            node.visits += 1
+            node.wins += score
+
+    return {cell: (child.visits, child.wins) for cell, child in root.children.items()}
+
+
+def search_root(grid_size, cells, heads, max_work, rng, search_time, first_moves=None,
+                pool=None, workers=1):
+    """
+    search(), spread over `workers` processes of `pool` if given: one
+    tree each, their root statistics added up. Seeds come from rng.
+    """
+    if pool is None or workers < 2:
+        return search(grid_size, cells, heads, max_work, rng.getrandbits(64), search_time,
+                      first_moves)
+    share = -(-max_work // workers)
+    futures = [pool.submit(search, grid_size, cells, heads, share, rng.getrandbits(64),
+                           search_time, first_moves)
+               for _ in range(workers)]
+    stats = {}
+    for future in futures:
+        for cell, (visits, wins) in future.result().items():
+            total = stats.get(cell, (0, 0.0))
+            stats[cell] = (total[0] + visits, total[1] + wins)
+    return stats
+
+
+def get_move(game_state, player_id, board=None, rng=None,
+             max_work=MAX_WORK, search_time=SEARCH_TIME, pool=None, workers=1):
+    """
+    MCTS Bot: plays the fight with its nearest opponents out a few dozen
+    times and takes the most-played first move; walled in alone, plays
+    the endgame (bots.endgame).
+    """
+    started = time.perf_counter()
+    if board is None:
+        board = BoardView.from_state(game_state)
+    if rng is None:
+        rng = random
+    if not board.alive[player_id]:
+        return None
+
+    x, y = board.heads[player_id]
+    size = board.grid_size
+    current_direction = board.directions[player_id]
+
+    moves = {}
+    for move, (dx, dy) in _DELTAS.items():
+        nx, ny = x + dx, y + dy
+        if move != _OPPOSITE[current_direction] and board.is_free(nx, ny):
+            moves[ny * size + nx] = move
+    if not moves:
+        return current_direction
+
+    # No opponent left to play out against: plan the fill instead
+    move = endgame_move(board, player_id)
+    if move is not None:
+        return move
+
+    # Never into a smaller region than we could have: random playouts are
+    # too short-sighted to see that kind of trap coming
+    space = {cell: board.region_size(cell % size, cell // size) for cell in moves}
+    most = max(space.values())
+    roomy = [cell for cell in moves if space[cell] == most]
+
+    # The nearest living opponents whose heads touch one of our regions
+    our_regions = {board.region_labels[cell] for cell in roomy}
+    touching = board.region_heads()
+    rivals = {pid for label in our_regions for pid in touching.get(label, ()) if pid != player_id}
+    if rivals and len(roomy) > 1:
+        nearest = sorted(rivals, key=lambda pid: (abs(board.heads[pid][0] - x)
+                                                  + abs(board.heads[pid][1] - y), pid))
+        heads = [y * size + x] + [board.heads[pid][1] * size + board.heads[pid][0]
+                                  for pid in nearest[:MAX_RIVALS]]
+        cells = board.cells
+        if not isinstance(cells, (bytes, bytearray)):
+            cells = bytes(map(bool, cells))  # Views and array('H') grids don't pickle
+        remaining = search_time - (time.perf_counter() - started)
+        stats = search_root(size, cells, heads, max_work, rng, remaining, roomy, pool, workers)
+        if stats:
+            best = max(stats, key=lambda cell: (stats[cell][0], stats[cell][1]))
+            return moves[best]
+
+    # Alone, no choice, or out of time before the first playout:
+    # most space, straight on ties
+    best_moves = [moves[cell] for cell in roomy]
+    if current_direction in best_moves:
+        return current_direction
+    return rng.choice(best_moves)
@@ -1,39 +1,21 @@
 import random
 
-def get_move(game_state, player_id):
-    player = game_state['players'][player_id]
-    if not player['is_alive']:
-        return None 
-
-    x = player['x']
-    y = player['y']
-    grid_size = game_state['grid_size']
+from bots.chambers import CHAMBER_LIMIT, move_spaces
+from game import BoardView
 
-    occupied = set()
-    for p in game_state['players']:
-        for (tx, ty) in p['trail']:
-            occupied.add((tx, ty))
+def get_move(game_state, player_id, board=None, rng=None):
+    if board is None:
+        board = BoardView.from_state(game_state)
+    if rng is None:
+        rng = random
+    if not board.alive[player_id]:
+        return None 
 
-    current_direction_str = 'UP' 
-    if len(player['trail']) < 2:
-        current_direction_str = random.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
-    else:
-        last_pos = player['trail'][-1]
-        prev_pos = player['trail'][-2]
-        dx = last_pos[0] - prev_pos[0]
-        dy = last_pos[1] - prev_pos[1]
+    x, y = board.heads[player_id]
 
-        if dx == 1: current_direction_str = 'RIGHT'
-        elif dx == -1: current_direction_str = 'LEFT'
-        elif dy == 1: current_direction_str = 'DOWN'
-        elif dy == -1: current_direction_str = 'UP'
+    current_direction_str = board.directions[player_id]
 
-    def is_safe(check_x, check_y):
-        if not (0 <= check_x < grid_size and 0 <= check_y < grid_size):
-            return False
-        if (check_x, check_y) in occupied:
-            return False
-        return True
+    is_safe = board.is_free
 
     possible_moves = ['UP', 'DOWN', 'LEFT', 'RIGHT']
     if current_direction_str == 'UP':
@@ -59,6 +41,13 @@ def get_move(game_state, player_id):
     if not safe_moves:
         return current_direction_str 
 
+    # Stay out of pockets that hold less than another move offers
+    steps = {'UP': (x, y - 1), 'DOWN': (x, y + 1), 'LEFT': (x - 1, y), 'RIGHT': (x + 1, y)}
+    rooms = move_spaces(board, x, y)
+    room = {move: rooms[steps[move]] for move in safe_moves}
+    enough = min(max(room.values()), CHAMBER_LIMIT)
+    safe_moves = [move for move in safe_moves if room[move] >= enough]
+
     # Prioritize moves that lead to open spaces
     preferred_moves = []
     for move in safe_moves:
@@ -72,5 +61,5 @@ def get_move(game_state, player_id):
             preferred_moves.append('RIGHT')
 
     if preferred_moves:
-        return random.choice(preferred_moves)
-    return random.choice(safe_moves)
\ No newline at end of file
+        return rng.choice(preferred_moves)
+    return rng.choice(safe_moves)
\ No newline at end of file
@@ -1,73 +1,33 @@
 import random
-from collections import deque
 
-def get_move(game_state, player_id):
+from bots.chambers import CHAMBER_LIMIT, fillable
+from bots.reach import reach_for
+from game import BoardView, BOT_SCAN_LIMIT
+
+def get_move(game_state, player_id, board=None, rng=None):
     """
     An advanced bot that uses BFS to find the safest move by evaluating space availability.
     """
     
-    player = game_state['players'][player_id]
-    if not player['is_alive']:
+    # --- Shared board (built here for old-style callers) ---
+    if board is None:
+        board = BoardView.from_state(game_state)
+    # --- This player's random stream from the runner ---
+    if rng is None:
+        rng = random
+    if not board.alive[player_id]:
         return None 
 
-    x = player['x']
-    y = player['y']
-    grid_size = game_state['grid_size']
-
-    # --- Build a set of all occupied coordinates for quick lookup ---
-    occupied = set()
-    for p in game_state['players']:
-        for (tx, ty) in p['trail']:
-            occupied.add((tx, ty))
+    x, y = board.heads[player_id]
+    grid_size = board.grid_size
 
-    # --- Get current direction from trail ---
-    current_direction_str = 'UP' # Default
-    if len(player['trail']) < 2:
-        current_direction_str = random.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
-    else:
-        last_pos = player['trail'][-1]
-        prev_pos = player['trail'][-2]
-        dx = last_pos[0] - prev_pos[0]
-        dy = last_pos[1] - prev_pos[1]
-
-        if dx == 1: current_direction_str = 'RIGHT'
-        elif dx == -1: current_direction_str = 'LEFT'
-        elif dy == 1: current_direction_str = 'DOWN'
-        elif dy == -1: current_direction_str = 'UP'
+    # --- Current direction ---
+    current_direction_str = board.directions[player_id]
 
     # --- Helper to check if a future coordinate is safe ---
-    def is_safe(check_x, check_y):
-        if not (0 <= check_x < grid_size and 0 <= check_y < grid_size):
-            return False
-        if (check_x, check_y) in occupied:
-            return False
-        return True
-
-    # --- BFS to find reachable space from a given position ---
-    def get_reachable_space(start_x, start_y):
-        if not is_safe(start_x, start_y):
-            return 0
-        
-        visited = set()
-        queue = deque([(start_x, start_y)])
-        visited.add((start_x, start_y))
-        count = 0
-        
-        while queue:
-            curr_x, curr_y = queue.popleft()
-            count += 1
-            
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                new_x, new_y = curr_x + dx, curr_y + dy
-                if (new_x, new_y) not in visited and is_safe(new_x, new_y):
-                    visited.add((new_x, new_y))
-                    queue.append((new_x, new_y))
-                    
-                    # Limit search to avoid taking too long
-                    if count > grid_size * grid_size * 0.5:
-                        break
-        
-        return count
+    is_safe = board.is_free
+    cells = board.cells
+    size = grid_size
 
     # --- Check potential moves (avoid 180 turns) ---
     possible_moves = ['UP', 'DOWN', 'LEFT', 'RIGHT']
@@ -81,8 +41,8 @@ def get_move(game_state, player_id):
         possible_moves.remove('LEFT')
 
     # Evaluate each safe move based on reachable space
-    move_scores = {}
     safe_moves = []
+    starts = []
     
     for move in possible_moves:
         new_x, new_y = x, y
@@ -97,8 +57,16 @@ def get_move(game_state, player_id):
         
         if is_safe(new_x, new_y):
             safe_moves.append(move)
-            space_count = get_reachable_space(new_x, new_y)
-            move_scores[move] = space_count
+            starts.append(new_y * size + new_x)
+
+    # --- BFS for the reachable space behind each safe move (one fill per region) ---
+    # Limit search to avoid taking too long: more than half the board is plenty
+    limit = min(BOT_SCAN_LIMIT, size * size // 2 + 1)
+    space_counts = reach_for(grid_size).count_many(cells, starts, limit=limit)
+    # A small pocket holds less than it counts: only what a path can fill
+    space_counts = [fillable(size, cells, start) if count < min(limit, CHAMBER_LIMIT) else count
+                    for start, count in zip(starts, space_counts)]
+    move_scores = dict(zip(safe_moves, space_counts))
 
     # --- Make a decision ---
     if not safe_moves:
@@ -110,7 +78,7 @@ def get_move(game_state, player_id):
         current_space = move_scores[current_direction_str]
         # If current direction has significantly less space than others, reconsider
         max_space = max(move_scores.values())
-        if current_space >= max_space * 0.8 or random.random() < 0.6:
+        if current_space >= max_space * 0.8 or rng.random() < 0.6:
             return current_direction_str
 
     # Choose the move with the most reachable space
@@ -0,0 +1,180 @@
+"""
+Shared flood fills for the bots.
+
+Reach counts the free cells a BFS gets to from a start cell, over the
+flat occupancy grid (board.cells, index = y * grid_size + x). Instead of
+a set of visited (x, y) tuples it keeps one reusable stamp per cell: each
+fill bumps a generation counter and a cell counts as visited when its
+stamp equals the current generation, so nothing is cleared or allocated
+between calls. Each thread gets its own Reach, since bots on different
+threads (bot_runner.BotRunner) would otherwise stamp over each other's
+fills. Neighbours come from a precomputed table: every cell has a
+one-byte edge class (interior, wall, corner) indexing the tuple of index
+offsets to its neighbours, so there are no bounds checks in the inner
+loop and the table stays one byte per cell on huge boards.
+
+Example:
+    reach = reach_for(board.grid_size)
+    space = reach.count(board.cells, y * board.grid_size + x, limit=200)
+"""
+import threading
+from array import array
+from functools import lru_cache
+
+# Stamps are 32-bit; after this many fills they're cleared and reused
+_MAX_GENERATION = 0xFFFFFFFF
+# Boards up to this size get a full per-cell neighbour_table (one tuple
+# per cell); bigger ones work it out from the edge classes on the fly
+NEIGHBOUR_TABLE_MAX = 128
+
+# Per-thread cache of Reach objects (see reach_for)
+_local = threading.local()
+
+
+def reach_for(grid_size):
+    """
+    The Reach for this arena size, shared by every bot on this thread.
+    """
+    reaches = getattr(_local, 'reaches', None)
+    if reaches is None:
+        reaches = _local.reaches = lru_cache(maxsize=8)(Reach)
+    return reaches(grid_size)
+
+
+class _EdgeNeighbours:
+    """
+    neighbours[cell] worked out from a Reach's edge classes, for boards
+    too big to tabulate.
+    """
+
+    def __init__(self, reach):
+        self.edge_class = reach.edge_class
+        self.offsets = reach.offsets
+
+    def __getitem__(self, cell):
+        return tuple(cell + offset for offset in self.offsets[self.edge_class[cell]])
+
+
+@lru_cache(maxsize=4)
+def neighbour_table(grid_size):
+    """
+    neighbours[cell] is a tuple of the on-board cells next to it, for
+    searches that step around a board cell by cell.
+    """
+    reach = reach_for(grid_size)
+    if grid_size > NEIGHBOUR_TABLE_MAX:
+        return _EdgeNeighbours(reach)
+    return [tuple(cell + offset for offset in reach.offsets[edge_class])
+            for cell, edge_class in enumerate(reach.edge_class)]
+
+
+class Reach:
+    """
+    Flood fills over a grid_size x grid_size board. Not thread-safe: the
+    stamps are shared between calls, so use reach_for() for one per thread.
+    """
+
+    def __init__(self, grid_size):
+        self.grid_size = grid_size
+        size = grid_size
+        classes = {}
+        self.offsets = []
+
+        def edge_row(y):
+            row = bytearray(size)
+            for x in range(size):
+                offsets = tuple(offset for offset, on_board in (
+                    (-size, y > 0), (size, y < size - 1), (-1, x > 0), (1, x < size - 1)
+                ) if on_board)
+                if offsets not in classes:
+                    classes[offsets] = len(self.offsets)
+                    self.offsets.append(offsets)
+                row[x] = classes[offsets]
+            return row
+
+        # Only the first and last rows differ from the ones in between
+        if size < 3:
+            self.edge_class = bytearray().join(edge_row(y) for y in range(size))
+        else:
+            self.edge_class = edge_row(0) + edge_row(1) * (size - 2) + edge_row(size - 1)
+        self.stamps = array('I', bytes(4 * size * size))
+        self.generation = 0
+
+    def _next_generation(self):
+        if self.generation == _MAX_GENERATION:
+            self.stamps = array('I', bytes(4 * len(self.stamps)))
+            self.generation = 0
+        self.generation += 1
+        return self.generation
+
+    def count(self, cells, start, limit=None, max_depth=None):
+        """
+        How many free cells a BFS from `start` (a cell index) reaches,
+        start included; 0 if start is occupied. Stops at `limit` cells,
+        and with max_depth only counts cells at most that many steps away.
+        """
+        if cells[start]:
+            return 0
+        return self._fill(cells, start, limit, max_depth)[0]
+
+    def count_many(self, cells, starts, limit=None):
+        """
+        count() for several starts (cell indexes) in one pass: a fill
+        that finishes under the limit also answers every later start in
+        the region it covered. Returns the counts in the order given.
+        """
+        counts = []
+        regions = []  # (generation, count) of every fill that finished
+        for start in starts:
+            if cells[start]:
+                counts.append(0)
+                continue
+            stamp = self.stamps[start]
+            for generation, region_count in regions:
+                if stamp == generation:
+                    counts.append(region_count)
+                    break
+            else:
+                found, finished = self._fill(cells, start, limit, None)
+                if finished:
+                    regions.append((self.generation, found))
+                counts.append(found)
+        return counts
+
+    def _fill(self, cells, start, limit, max_depth):
+        """
+        The BFS behind count(): returns (cells found, whether it ran out of
+        cells rather than hitting `limit`).
+        """
+        generation = self._next_generation()
+        stamps = self.stamps
+        edge_class = self.edge_class
+        offsets = self.offsets
+        if limit is None:
+            limit = len(stamps)
+        if max_depth is None:
+            max_depth = len(stamps)
+
+        stamps[start] = generation
+        queue = [start]
+        if limit <= 1:
+            return limit, False
+        head = 0
+        depth = 0
+        level_end = 1  # queue[:level_end] is everything up to `depth` steps away
+        while head < len(queue):
+            if head == level_end:
+                depth += 1
+                level_end = len(queue)
+            if depth >= max_depth:
+                break  # The rest of the queue is as far out as we look
+            cell = queue[head]
+            head += 1
+            for offset in offsets[edge_class[cell]]:
+                n = cell + offset
+                if stamps[n] != generation and not cells[n]:
+                    stamps[n] = generation
+                    queue.append(n)
+                    if len(queue) >= limit:
+                        return limit, False
+        return len(queue), True
@@ -0,0 +1,75 @@
+import random
+
+from bots.endgame import endgame_move
+from game import BoardView
+from territory import compute_territory
+
+# Score penalty for stepping next to another head (it may take the same cell)
+HEAD_ON_PENALTY = 1000
+
+def get_move(game_state, player_id, board=None, rng=None):
+    """
+    Voronoi Bot: picks the move that leaves it the most territory, i.e.
+    the most free cells it can reach before any opponent can.
+    """
+    # --- 1. Shared board (built here for old-style callers) ---
+    if board is None:
+        board = BoardView.from_state(game_state)
+    if rng is None:
+        rng = random
+    if not board.alive[player_id]:
+        return None
+
+    x, y = board.heads[player_id]
+    size = board.grid_size
+    current_direction = board.directions[player_id]
+
+    # --- 2. Moves that don't hit anything right away (no 180s) ---
+    deltas = {'UP': (0, -1), 'DOWN': (0, 1), 'LEFT': (-1, 0), 'RIGHT': (1, 0)}
+    opposite = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
+    moves = []
+    for move, (dx, dy) in deltas.items():
+        nx, ny = x + dx, y + dy
+        if move != opposite[current_direction] and board.is_free(nx, ny):
+            moves.append((move, nx, ny))
+    if not moves:
+        return current_direction
+
+    # Walled in on our own: play the endgame out (see bots.endgame)
+    move = endgame_move(board, player_id)
+    if move is not None:
+        return move
+
+    opponents = [pid for pid in range(len(board.heads)) if board.alive[pid] and pid != player_id]
+
+    # --- 3. Alone in our regions? Then it's just about space ---
+    # Only an opponent whose head touches one of the regions we can step
+    # into can still take cells from us.
+    our_regions = {board.region_labels[ny * size + nx] for _, nx, ny in moves}
+    touching = board.region_heads()
+    in_contact = any(pid != player_id for label in our_regions for pid in touching.get(label, ()))
+
+    # --- 4. Score each move by the territory it leaves us ---
+    scores = {}
+    for move, nx, ny in moves:
+        if not in_contact:
+            scores[move] = board.region_size(nx, ny)
+            continue
+        heads = list(board.heads)
+        heads[player_id] = (nx, ny)
+        after = compute_territory(size, board.cells, heads, board.alive)
+        mine = after.counts[player_id]
+        best_other = max((after.counts[pid] for pid in opponents), default=0)
+        score = mine - best_other
+        for pid in opponents:
+            ox, oy = board.heads[pid]
+            if abs(ox - nx) + abs(oy - ny) == 1:
+                score -= HEAD_ON_PENALTY
+        scores[move] = score
+
+    # --- 5. Best score; keep going straight on ties, else pick at random ---
+    best = max(scores.values())
+    best_moves = [move for move, score in scores.items() if score == best]
+    if current_direction in best_moves:
+        return current_direction
+    return rng.choice(best_moves)
@@ -1,7 +1,63 @@
 import random
 import sys
 import os
-import math
+import time
+from array import array
+from types import MappingProxyType
+
+from regions import RegionIndex, heads_by_region
+from spawns import plan_spawns
+from territory import compute_territory
+
+# Arena size for each player count (used by the UI and the simulator).
+# Anything not listed falls back to DEFAULT_GRID_SIZE.
+GRID_SIZE_BY_PLAYERS = {
+    2: 22,
+    3: 25,
+    4: 27,
+    5: 30,
+    6: 33,
+    7: 36,
+    8: 40,
+}
+DEFAULT_GRID_SIZE = 50
+
+# Direction names. Internally (Player, the batch engine) a direction is a
+# small int code: the index into this tuple. Opposites differ only in bit 0.
+DIRECTIONS = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTIONS)}
+DIRECTION_DELTAS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# Version of the get_update() format sent to the frontend.
+# Bump this whenever the shape of a full or delta update changes.
+STATE_PROTOCOL_VERSION = 1
+
+# The occupancy grid stores (player id + 1): one byte per cell for up to
+# BYTE_GRID_PLAYERS players, two bytes (array('H')) beyond that.
+BYTE_GRID_PLAYERS = 255
+MAX_PLAYERS = 65535
+
+# Massive-arena mode (Game(massive=True)), for hundreds of players on grids
+# up to 1000x1000. A region split check gives up after this many cells,
+# see regions.py.
+MASSIVE_SPLIT_BUDGET = 2048
+
+# Flood fills in the bots stop after this many cells. It never binds on the
+# UI's arenas (50x50 at most), but keeps each move bounded on huge ones.
+BOT_SCAN_LIMIT = 4096
+
+
+def grid_size_for_players(player_count):
+    return GRID_SIZE_BY_PLAYERS.get(player_count, DEFAULT_GRID_SIZE)
+
+
+def new_grid(cell_count, player_count):
+    """
+    An empty occupancy grid wide enough for player_count owners.
+    """
+    if player_count <= BYTE_GRID_PLAYERS:
+        return bytearray(cell_count)
+    return array('H', bytes(2 * cell_count))
 
 # -----------------------------------------------
 # --- PLAYER CLASS ---
@@ -10,26 +66,41 @@ class Player:
     """
     Represents a single player.
     NOW stores name and color from a config.
+
+    Kept compact since batch runs keep thousands of these alive:
+    direction / next_direction are direction codes (see DIRECTIONS) and
+    trail is an array('I') of packed cell indices (y * grid_size + x).
+    Use direction_name and trail_cells() for the readable versions.
     """
-    def __init__(self, id, x, y, direction, name, color):
+    __slots__ = ('id', 'x', 'y', 'direction', 'next_direction', 'is_alive',
+                 'death_tick', 'trail', 'grid_size', 'color', 'name')
+
+    def __init__(self, id, x, y, direction, name, color, grid_size):
         self.id = id
         self.x = x
         self.y = y
         self.direction = direction
         self.next_direction = direction
         self.is_alive = True
-        self.trail = [(x, y)]
+        self.death_tick = None # Tick on which the player crashed
+        self.grid_size = grid_size
+        self.trail = array('I', [y * grid_size + x])
         self.color = color # Assigned color (e.g., '#FF0000')
         self.name = name   # Assigned name (e.g., 'human' or 'gemini_bot')
 
+    @property
+    def direction_name(self):
+        return DIRECTIONS[self.direction]
+
     def set_direction(self, direction):
-        if (self.direction == 'UP' and direction == 'DOWN') or \
-           (self.direction == 'DOWN' and direction == 'UP') or \
-           (self.direction == 'LEFT' and direction == 'RIGHT') or \
-           (self.direction == 'RIGHT' and direction == 'LEFT'):
+        """
+        Takes a direction name ('UP', ...). Reversing is ignored.
+        """
+        code = DIRECTION_CODES.get(direction)
+        if code is None or code == self.direction ^ 1:
             return
-            
-        self.next_direction = direction
+
+        self.next_direction = code
 
     def move(self):
         if not self.is_alive:
@@ -37,16 +108,148 @@ class Player:
 
         self.direction = self.next_direction
 
-        if self.direction == 'UP':
-            self.y -= 1
-        elif self.direction == 'DOWN':
-            self.y += 1
-        elif self.direction == 'LEFT':
-            self.x -= 1
-        elif self.direction == 'RIGHT':
-            self.x += 1
-        
-        self.trail.append((self.x, self.y))
+        dx, dy = DIRECTION_DELTAS[self.direction]
+        x = self.x = self.x + dx
+        y = self.y = self.y + dy
+
+        # Running off the board can't be packed into the trail;
+        # trail_cells() adds that last position back from x, y.
+        size = self.grid_size
+        if 0 <= x < size and 0 <= y < size:
+            self.trail.append(y * size + x)
+
+    def trail_cells(self, start=0):
+        """
+        The trail as [(x, y), ...] from position `start` on, where entry k
+        is where the player was after tick k (entry 0 is the spawn). For a
+        player that ran into a wall the last entry is off the board.
+        """
+        size = self.grid_size
+        cells = [(index % size, index // size) for index in self.trail[start:]]
+        if not (0 <= self.x < size and 0 <= self.y < size) and start <= len(self.trail):
+            cells.append((self.x, self.y))
+        return cells
+
+
+# -----------------------------------------------
+# --- BOARD VIEW ---
+# -----------------------------------------------
+class BoardView:
+    """
+    Immutable snapshot of the board for one tick, shared by every bot.
+    Built once per tick by Game.board_view() so bots don't have to
+    rebuild an occupied set from the trails themselves.
+
+    cells is a flat bytes copy of the occupancy grid
+    (index = y * grid_size + x, 0 = free, else owner id + 1).
+    heads, directions and alive are indexed by player id.
+    region_labels / region_sizes are a copy of the game's RegionIndex,
+    so region_size() answers "how much space is connected to this cell"
+    without a flood fill. territory() splits the free cells by which head
+    reaches them first (see territory.py); it's computed on first use.
+
+    With copy=False (massive arenas, where copying the board every tick
+    would cost more than the tick itself) cells / region_labels /
+    region_sizes are read-only views of the live game instead, only valid
+    until the next Game.update().
+
+    memo is a dict that lasts as long as the game (Game.bot_memo), for
+    bots that carry plans from one move to the next; each bot keeps its
+    state under a key of its own. It's never copied.
+    """
+    __slots__ = ('grid_size', 'cells', 'heads', 'directions', 'alive',
+                 'region_labels', 'region_sizes', 'memo', '_territory')
+
+    def __init__(self, grid_size, cells, heads, directions, alive, regions=None, copy=True,
+                 memo=None):
+        if regions is None:
+            regions = RegionIndex(grid_size, cells)
+        if copy:
+            cells = bytes(cells) if isinstance(cells, (bytes, bytearray)) else cells[:]
+            labels = regions.labels[:]
+            sizes = dict(regions.sizes)
+        else:
+            cells = memoryview(cells).toreadonly()
+            labels = memoryview(regions.labels).toreadonly()
+            sizes = MappingProxyType(regions.sizes)
+        object.__setattr__(self, 'grid_size', grid_size)
+        object.__setattr__(self, 'cells', cells)
+        object.__setattr__(self, 'heads', tuple(heads))
+        object.__setattr__(self, 'directions', tuple(directions))
+        object.__setattr__(self, 'alive', tuple(alive))
+        object.__setattr__(self, 'region_labels', labels)
+        object.__setattr__(self, 'region_sizes', sizes)
+        object.__setattr__(self, 'memo', {} if memo is None else memo)
+        object.__setattr__(self, '_territory', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BoardView is immutable")
+
+    @classmethod
+    def from_state(cls, game_state):
+        """
+        Builds a BoardView from a get_state() dict. This walks every trail,
+        so it's only meant for bots that are called without a board.
+        """
+        grid_size = game_state['grid_size']
+        cells = new_grid(grid_size * grid_size, len(game_state['players']))
+        for p in game_state['players']:
+            trail = p['trail']
+            # A dead player's last trail cell is where it crashed, which
+            # the engine never claims (wall, someone's trail, or a head-on).
+            if not p['is_alive']:
+                trail = trail[:-1]
+            for (tx, ty) in trail:
+                cells[ty * grid_size + tx] = p['id'] + 1
+        players = game_state['players']
+        return cls(
+            grid_size,
+            cells,
+            [(p['x'], p['y']) for p in players],
+            [p['direction'] for p in players],
+            [p['is_alive'] for p in players],
+        )
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.grid_size and 0 <= y < self.grid_size
+
+    def is_free(self, x, y):
+        size = self.grid_size
+        return 0 <= x < size and 0 <= y < size and not self.cells[y * size + x]
+
+    def owner(self, x, y):
+        """
+        Player id occupying (x, y), or None if the cell is free.
+        """
+        value = self.cells[y * self.grid_size + x]
+        return value - 1 if value else None
+
+    def region_size(self, x, y):
+        """
+        Number of free cells in the region containing (x, y), counting (x, y)
+        itself; 0 if it's occupied or off the board. O(1).
+        """
+        size = self.grid_size
+        if not (0 <= x < size and 0 <= y < size):
+            return 0
+        return self.region_sizes.get(self.region_labels[y * size + x], 0)
+
+    def region_heads(self):
+        """
+        {region label: [ids of living players whose head touches it]}
+        """
+        return heads_by_region(self.grid_size, self.region_labels, self.heads, self.alive)
+
+    def territory(self):
+        """
+        The Voronoi territory of every living player on this board
+        (a territory.Territory). Computed once, then shared by every
+        bot that asks this tick.
+        """
+        if self._territory is None:
+            object.__setattr__(self, '_territory', compute_territory(
+                self.grid_size, self.cells, self.heads, self.alive))
+        return self._territory
 
 
 # -----------------------------------------------
@@ -60,81 +263,107 @@ class Game:
     
     # We no longer need PLAYER_COLORS here
 
-    def __init__(self, grid_size, player_config):
+    def __init__(self, grid_size, player_config, spawns=None, seed=None, massive=False):
+        """
+        spawns optionally fixes the start positions as [(x, y, direction code), ...]
+        (one per player, e.g. from a replay) instead of picking them at random.
+        seed makes the game reproducible: the spawns come from self.rng and
+        each player gets its own random stream derived from the seed
+        (player_rngs), so the same (seed, bots) always plays the same game,
+        in any process.
+        massive=True is the large-arena mode: bounded region split checks
+        (MASSIVE_SPLIT_BUDGET) and zero-copy BoardViews, so a tick costs
+        about the same whatever the board size.
+        """
         self.grid_size = grid_size
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.player_config = player_config # e.g., [{'name': 'human', 'color': '#F00'}, ...]
         self.players = []
         self.game_over = False
         self.winner = None
-        self.occupied_coords = set()
-        self._initialize_players()
+        self.tick = 0 # Number of update() calls so far
+        self.metrics = None # Optional metrics.TickMetrics to time update() phases
+        self.replay = None  # Optional replay.ReplayWriter, fed after every update()
+        self.bot_memo = {}  # Bots' state across this game's moves (see BoardView)
 
-    def _initialize_players(self):
+        self.massive = massive
+
+        # Occupancy grid, row-major (index = y * grid_size + x), see new_grid.
+        # 0 means empty, otherwise it holds (owner player id + 1).
+        if len(player_config) > MAX_PLAYERS:
+            raise ValueError(f"At most {MAX_PLAYERS} players are supported, got {len(player_config)}")
+        self._grid = new_grid(grid_size * grid_size, len(player_config))
+
+        # Connected regions of free cells, kept up to date by _occupy (see regions.py).
+        # Built after spawning so the spawn cells don't each trigger an update.
+        self.regions = None
+        if spawns is None:
+            self._initialize_players()
+        else:
+            if len(spawns) != len(player_config):
+                raise ValueError(f"Got {len(spawns)} spawns for {len(player_config)} players")
+            for i, (x, y, direction) in enumerate(spawns):
+                self._add_player(i, x, y, direction)
+
+        # One stream per player, for bots (see bot_runner). Seeded from
+        # the game seed and the player id alone, so adding a player or a
+        # bot drawing more numbers never shifts anyone else's stream.
+        if seed is None:
+            self.player_rngs = [random.Random() for _ in player_config]
+        else:
+            self.player_rngs = [random.Random(f"{seed}:{i}") for i in range(len(player_config))]
+        self.regions = RegionIndex(grid_size, self._grid,
+                                   MASSIVE_SPLIT_BUDGET if massive else None)
+        # Players still alive, so a tick only touches those
+        self._alive = list(self.players)
+
+    @property
+    def grid(self):
         """
-        Creates players from the provided player_config, ensuring
-        they don't spawn too close to walls or each other.
+        Read-only view of the occupancy grid (see __init__ for the layout).
         """
-        start_margin = 5  # Min 5 cells from wall (increased padding)
-        min_dist = 10     # Min 10 cells from other players
+        return memoryview(self._grid).toreadonly()
 
-        # Keep track of spawn points just for this function
-        spawn_points = []
+    def is_occupied(self, x, y):
+        return self._grid[y * self.grid_size + x] != 0
 
-        for i, config in enumerate(self.player_config):
-            
-            # Try 100 times to find a good spot
-            for _ in range(100): 
-                x = random.randint(start_margin, self.grid_size - 1 - start_margin)
-                y = random.randint(start_margin, self.grid_size - 1 - start_margin)
-                
-                # --- NEW SAFE SPAWN CHECK ---
-                # Check distance from other spawn points
-                is_safe = True
-                for (sx, sy) in spawn_points:
-                    dist = math.sqrt((x - sx)**2 + (y - sy)**2)
-                    if dist < min_dist:
-                        is_safe = False
-                        break
-                # --- END NEW CHECK ---
-                
-                # If it's a safe distance, use this spot
-                if is_safe:
-                    direction = random.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
-                    
-                    # Create player using the config
-                    player = Player(
-                        id=i,
-                        x=x,
-                        y=y,
-                        direction=direction,
-                        name=config['name'],
-                        color=config['color']
-                    )
-                    
-                    self.players.append(player)
-                    self.occupied_coords.add((x, y))
-                    spawn_points.append((x, y)) # Add to our local list for checking
-                    break # This breaks out of the "for _ in range(100)" loop
-            
-            # This 'else' belongs to the 'for _ in range(100)' loop
-            # It only runs if the loop finishes without 'break'-ing
-            else:
-                # Fallback: If 100 tries fail, just place the player anywhere
-                # to prevent a crash. This should be rare.
-                print(f"Warning: Could not find a safe spawn for player {i}. Placing randomly.")
-                x = random.randint(start_margin, self.grid_size - 1 - start_margin)
-                y = random.randint(start_margin, self.grid_size - 1 - start_margin)
-                direction = random.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
-                player = Player(
-                    id=i,
-                    x=x,
-                    y=y,
-                    direction=direction,
-                    name=config['name'],
-                    color=config['color']
-                )
-                self.players.append(player)
-                self.occupied_coords.add((x, y))
+    def _occupy(self, x, y, player_id):
+        """
+        Marks a cell as claimed by a player. Every write to the grid goes through here.
+        """
+        index = y * self.grid_size + x
+        self._grid[index] = player_id + 1
+        if self.regions is not None:
+            self.regions.claim(index)
+
+    def _initialize_players(self):
+        """
+        Creates players from the provided player_config, at spawns that keep
+        clear of the walls and of each other (see spawns.py).
+        Raises ValueError if the arena is too small for them.
+        """
+        points = plan_spawns(self.grid_size, len(self.player_config), self.rng)
+        for i, (x, y) in enumerate(points):
+            direction = self.rng.choice(DIRECTIONS)
+            self._add_player(i, x, y, DIRECTION_CODES[direction])
+
+    def _add_player(self, i, x, y, direction):
+        """
+        Creates player i from its player_config entry at a spawn point.
+        """
+        config = self.player_config[i]
+        player = Player(
+            id=i,
+            x=x,
+            y=y,
+            direction=direction,
+            name=config['name'],
+            color=config['color'],
+            grid_size=self.grid_size
+        )
+        self.players.append(player)
+        self._occupy(x, y, i)
         
     def submit_move(self, player_id, direction):
         if 0 <= player_id < len(self.players):
@@ -144,45 +373,72 @@ class Game:
         if self.game_over:
             return
 
-        # 1. Move
-        for player in self.players:
+        self.tick += 1
+
+        metrics = self.metrics
+        if metrics:
+            started = time.perf_counter()
+
+        # Only players alive at the start of the tick take part, so a tick
+        # costs O(alive players) however many have crashed already
+        movers = []
+        for player in self._alive:
             if player.is_alive:
-                player.move()
+                movers.append(player)
+            elif player.death_tick is None:
+                player.death_tick = self.tick  # Killed from outside since last tick
+
+        # 1. Move
+        for player in movers:
+            player.move()
+
+        if metrics:
+            moved = time.perf_counter()
+            metrics.record('move', moved - started, self.grid_size)
 
         # 2. Collisions
+        grid = self._grid
+        size = self.grid_size
         newly_occupied_by_head = {}
         
-        for player in self.players:
+        for player in movers:
             if not player.is_alive:
                 continue
             
             x, y = player.x, player.y
             
             # A) Wall
-            if not (0 <= x < self.grid_size and 0 <= y < self.grid_size):
+            if not (0 <= x < size and 0 <= y < size):
                 player.is_alive = False
                 continue
 
             # B) Trail
-            if (x, y) in self.occupied_coords:
+            index = y * size + x
+            if grid[index]:
                 player.is_alive = False
                 continue
 
             # C) Head-on
-            if (x, y) in newly_occupied_by_head:
+            if index in newly_occupied_by_head:
                 player.is_alive = False
-                other_player_id = newly_occupied_by_head[(x, y)]
+                other_player_id = newly_occupied_by_head[index]
                 self.players[other_player_id].is_alive = False 
             else:
-                newly_occupied_by_head[(x, y)] = player.id
+                newly_occupied_by_head[index] = player.id
 
-        # 3. Add new positions to occupied set
-        for player in self.players:
-            if player.is_alive and (player.x, player.y) in newly_occupied_by_head:
-                self.occupied_coords.add((player.x, player.y))
+        # 3. Claim the new head cells on the grid
+        for index, player_id in newly_occupied_by_head.items():
+            player = self.players[player_id]
+            if player.is_alive:
+                self._occupy(player.x, player.y, player_id)
 
-        # 4. Check for game over
-        alive_players = [p for p in self.players if p.is_alive]
+        # 4. Record deaths and check for game over
+        for player in movers:
+            if not player.is_alive:
+                player.death_tick = self.tick
+
+        alive_players = [p for p in movers if p.is_alive]
+        self._alive = alive_players
         if len(alive_players) <= 1:
             self.game_over = True
             if len(alive_players) == 1:
@@ -190,6 +446,27 @@ class Game:
             else:
                 self.winner = 'DRAW'
 
+        if metrics:
+            metrics.record('collision', time.perf_counter() - moved, self.grid_size)
+
+        if self.replay is not None:
+            self.replay.record(self)
+
+    def board_view(self):
+        """
+        Snapshot of the board for the bots (see BoardView).
+        """
+        return BoardView(
+            self.grid_size,
+            self._grid,
+            [(p.x, p.y) for p in self.players],
+            [p.direction_name for p in self.players],
+            [p.is_alive for p in self.players],
+            self.regions,
+            copy=not self.massive,
+            memo=self.bot_memo,
+        )
+
     def get_state(self):
         """
         NOW includes the player's name in the state.
@@ -202,42 +479,53 @@ class Game:
                     'name': p.name, # <-- NEW
                     'x': p.x,
                     'y': p.y,
-                    'direction': p.direction,
+                    'direction': p.direction_name,
                     'is_alive': p.is_alive,
-                    'trail': p.trail,
+                    'trail': p.trail_cells(),
                     'color': p.color
                 } for p in self.players
             ],
             'game_over': self.game_over,
-            'winner': self.winner
+            'winner': self.winner,
+            'tick': self.tick
         }
-        
-    def _generate_start_positions(self, num_players):
+
+    def get_update(self, since_tick=None):
         """
-        Generates a list of (x, y, directiton) tuples
-        that are not too close to each other or the walls
+        Versioned state update for the frontend.
+
+        With since_tick=None (or a tick we can't build a delta from) this is
+        a full snapshot: get_state() plus 'version' and 'type': 'full'.
+        Otherwise it's a delta with only what changed after since_tick:
+            'cells': [{'id': player id, 'cells': [[x, y], ...], 'direction': ...}, ...]
+                     new trail cells in order, the last one is the head
+            'dead':  ids of players that crashed after since_tick
+        so the payload stays the same size no matter how long the game runs.
         """
-        padding = 5
-        min_dist = 5
-        
-        positions = []
-        
-        for _ in range(num_players):
-            for _ in range(100):
-                x = random.randint(padding, self.grid_size - 1 - padding)
-                y = random.randint(padding, self.grid_size - 1 - padding)
-                
-                is_safe = True
-                for (px, py, p_dir) in positions:
-                    dist = math.sqrt((x - px)**2 + (y - py)**2)
-                    if dist < min_dist:
-                        is_safe = False
-                        break
-                
-                if is_safe:
-                    break
-            
-            direction = random.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
-            positions.append((x, y, direction))
-        
-        return positions
\ No newline at end of file
+        if since_tick is None or not (0 <= since_tick <= self.tick):
+            update = self.get_state()
+            update['version'] = STATE_PROTOCOL_VERSION
+            update['type'] = 'full'
+            return update
+
+        # trail[k] is where the player was after tick k (trail[0] is the spawn),
+        # so everything after since_tick is trail[since_tick + 1:].
+        cells = []
+        dead = []
+        for p in self.players:
+            new_cells = p.trail_cells(since_tick + 1)
+            if new_cells:
+                cells.append({'id': p.id, 'cells': new_cells, 'direction': p.direction_name})
+            if p.death_tick is not None and p.death_tick > since_tick:
+                dead.append(p.id)
+
+        return {
+            'version': STATE_PROTOCOL_VERSION,
+            'type': 'delta',
+            'tick': self.tick,
+            'since': since_tick,
+            'cells': cells,
+            'dead': dead,
+            'game_over': self.game_over,
+            'winner': self.winner
+        }
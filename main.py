@@ -1,59 +1,76 @@
+import argparse
+import base64
 import eel
+import gevent
+import multiprocessing
 import random
-from game import Game
-
-# --- 1. Import ALL bot modules ---
-# (Exactly like you had in app.py)
-try:
-    import bots.gemini_bot as gemini_bot
-    import bots.chatgpt_bot as chatgpt_bot
-    import bots.claude_bot as claude_bot
-    import bots.deepseek_bot as deepseek_bot
-    import bots.grok_bot as grok_bot
-    import bots.meta_bot as meta_bot
-    import bots.qwen_bot as qwen_bot
-except ImportError as e:
-    print(f"--- WARNING: Could not import all bots: {e} ---")
-
-# --- 2. Master Bot Configuration ---
-BOT_CONFIG = {
-    'gemini_bot':   {'color': '#4285F4', 'module': gemini_bot},
-    'chatgpt_bot':  {'color': '#75A593', 'module': chatgpt_bot},
-    'claude_bot':   {'color': '#D97A53', 'module': claude_bot},
-    'meta_bot':     {'color': '#0068FA', 'module': meta_bot},
-    'grok_bot':     {'color': '#8A2BE2', 'module': grok_bot},
-    'deepseek_bot': {'color': '#10B981', 'module': deepseek_bot},
-    'qwen_bot':     {'color': '#FF9900', 'module': qwen_bot},
-}
-AVAILABLE_BOT_NAMES = list(BOT_CONFIG.keys())
-
-# --- 3. Game Storage ---
-# We store the game and bots in a simple dictionary
-game_storage = {}
-
-
-# --- 4. Expose Python Functions to JavaScript ---
+import time
+from game import Game, grid_size_for_players
+from metrics import TickMetrics
+from sessions import SessionManager, MAX_SESSIONS
+from wire import encode_frame
+
+# --- 1. Bots ---
+# The bot imports and BOT_CONFIG live in bot_runner.py so the
+# headless simulator can use them without eel.
+from bot_runner import BOT_CONFIG, AVAILABLE_BOT_NAMES, BotRunner
+from bot_pool import BotPool, ParallelBotRunner
+
+# Time each bot gets to pick a move (seconds). With a bot pool the bots
+# think at the same time, one per worker; without one (--bot-workers 0)
+# they're asked one after another, so this times the bot count has to
+# fit in the 100 ms frame.
+#
+# The searching bots (alphabeta_bot, mcts_bot and bots/endgame.py) don't
+# watch the clock to size their moves: each has a budget counted in work
+# (nodes, simulated moves, states) that takes a few ms, plus a
+# wall-clock SEARCH_TIME a little under this timeout in case the work
+# runs slow. A seeded game replays move for move as long as the work
+# budget is what stops them; once SEARCH_TIME cuts a search short (a
+# slow or overloaded machine), the moves depend on timing.
+MOVE_TIMEOUT = 0.01
+
+# Worker processes bots think on (see bot_pool.py), shared by every session.
+# Enough for one bot each, but no more than there are cores.
+DEFAULT_BOT_WORKERS = min(len(AVAILABLE_BOT_NAMES), multiprocessing.cpu_count())
+bot_pool = None  # Started by main(); None runs the bots in this process
+
+# --- 2. Game Storage ---
+# Every browser gets its own session (game + bots), keyed by the session id
+# start_game hands back; see sessions.py. main() may replace this with one
+# configured from the command line.
+def _forget_pushes(session):
+    """
+    Drops the reply callbacks of pushes an ended session's page never
+    answered (e.g. it closed mid-game), which eel would keep forever.
+    """
+    for call_id in session.unanswered:
+        eel._call_return_callbacks.pop(call_id, None)
+    session.unanswered.clear()
+
+sessions = SessionManager(on_close=_forget_pushes)
+
+# Tick latency histograms, kept across games (see get_metrics)
+tick_metrics = TickMetrics()
+
+
+# --- 3. Expose Python Functions to JavaScript ---
 # Eel uses the @eel.expose decorator
 # This is the *magic* that lets JavaScript call Python
 
 @eel.expose  # <-- This function can now be called from JavaScript
-def start_game(playerCount):
+def start_game(playerCount, binaryFrames=False):
     """
     Replaces your /start-game route.
-    It now returns the initial state directly.
+    It now returns the initial state directly, plus the session_id the
+    client passes to submit_move from then on. After a COUNTDOWN the
+    server's tick loop starts pushing updates to the calling page's
+    receive_update (see tick_loop), or with binaryFrames, base64 wire.py
+    frames to its receive_frame.
     """
     player_count = int(playerCount)
     
-    size_mapping = {
-        2: 22,
-        3: 25,
-        4: 27,
-        5: 30,
-        6: 33,
-        7: 36,
-        8: 40,
-    }
-    grid_size = size_mapping.get(player_count, 50)
+    grid_size = grid_size_for_players(player_count)
     
     player_config = []
     player_config.append({'name': 'human', 'color': '#FF0000'}) # Red
@@ -72,62 +89,285 @@ def start_game(playerCount):
         bot_modules_for_game.append(bot_info['module'])
 
     game = Game(grid_size, player_config)
+    game.metrics = tick_metrics
+    if bot_pool is not None:
+        runner = ParallelBotRunner(bot_pool, bot_modules_for_game, move_timeout=MOVE_TIMEOUT,
+                                   metrics=tick_metrics)
+    else:
+        runner = BotRunner(bot_modules_for_game, move_timeout=MOVE_TIMEOUT, metrics=tick_metrics)
+
+    try:
+        session = sessions.create(game, runner)
+    except RuntimeError as e:
+        return {'error': str(e)}
+
+    print(f"Starting new game {session.id} with: {player_config}")
+
+    session.client = _caller_socket()
+    session.binary = bool(binaryFrames)
+    if session.client is not None:
+        session.start(time.monotonic() + COUNTDOWN)
     
-    # Store game and bots for the tick
-    game_storage['main_game'] = game
-    game_storage['bot_modules_for_game'] = bot_modules_for_game
-    
-    print(f"Starting new game with: {player_config}")
-    
-    # Just return the state! No more jsonify
-    return game.get_state()
+    # Always a full snapshot; the pushed updates are deltas from here on
+    update = game.get_update()
+    session.pushed_tick = game.tick
+    update['session_id'] = session.id
+    return update
 
 @eel.expose  # <-- This function can now be called from JavaScript
-def submit_move(direction):
+def submit_move(sessionId, direction):
     """
     Replaces your /submit-move route.
+    The move applies on the next tick; clients don't need to wait for
+    the reply.
     """
-    game = game_storage.get('main_game')
-    if game and not game.game_over and direction:
-        game.submit_move(0, direction) # Player 0 is human
+    session = sessions.get(sessionId)
+    if session is None:
+        return {'error': 'Unknown or expired session'}
+    with session.lock:
+        game = session.game
+        if not game.game_over and direction:
+            game.submit_move(0, direction) # Player 0 is human
     return {'success': True}
 
+def _run_tick(session):
+    """
+    One tick of a session's game: bot moves, then Game.update().
+    """
+    game = session.game
+    runner = session.runner
+    missed_before = len(runner.overruns)
+    # The bots think on a thread of the hub's pool: waiting for them there
+    # lets every other greenlet (other sessions' ticks, page calls) run
+    gevent.get_hub().threadpool.apply(runner.run_turns, (game,))
+    for overrun in runner.overruns[missed_before:]:
+        print(f"Bot {overrun['bot']} missed its move deadline on tick {overrun['tick']}")
+    with session.lock:
+        game.update()
+
+def _run_ticks(session, due):
+    """
+    Runs `due` ticks claimed with Session.claim_ticks (fewer if the game
+    ends first), then releases the session.
+    """
+    try:
+        for _ in range(due):
+            _run_tick(session)
+            if session.game.game_over:
+                break
+    finally:
+        session.release()
+
 @eel.expose  # <-- This function can now be called from JavaScript
-def game_tick():
+def game_tick(sessionId, ackTick=None):
+    """
+    Replaces your /game-tick route, for clients that poll instead of
+    taking pushed updates (the web page only calls it to resync).
+    Runs whatever ticks are due on the session's schedule (none if the
+    client polled early, see sessions.Session.ticks_due) and returns the
+    result. ackTick is the last tick the client has applied. When given,
+    only the changes since then are sent (see Game.get_update); without
+    it (or if it's out of range) the client gets a full snapshot.
+
+    A session the tick loop pushes to is left to it: a resync only gets
+    the current state, and the next push carries on from there.
+    """
+    session = sessions.get(sessionId)
+    if session is None:
+        return {'error': 'Unknown or expired session'}
+
+    ack_tick = None if ackTick is None else int(ackTick)
+
+    game = session.game
+    with session.lock:
+        if game.game_over:
+            return game.get_update(ack_tick)
+
+    tick_started = time.perf_counter()
+    if session.client is None:
+        # Nothing to run if another poll is already ticking this session
+        due = session.claim_ticks(time.monotonic())
+        if due:
+            _run_ticks(session, due)
+
+    with session.lock:
+        serialise_started = time.perf_counter()
+        update = game.get_update(ack_tick)
+        if session.client is not None:
+            # Ticks that ran since the last push are in this update already
+            session.pushed_tick = game.tick
+        finished = time.perf_counter()
+    tick_metrics.record('serialise', finished - serialise_started, game.grid_size)
+    tick_metrics.record('tick', finished - tick_started, game.grid_size)
+    return update
+
+@eel.expose
+def get_metrics():
+    """
+    p50/p95/p99 latency per tick phase and per bot, by grid size
+    (see metrics.TickMetrics.snapshot).
     """
-    Replaces your /game-tick route.
+    return tick_metrics.snapshot()
+
+
+# --- 4. Server Tick Loop ---
+# The server owns the clock: tick_loop advances every session on its
+# schedule and pushes each new update to that session's page, so the
+# tick rate doesn't depend on round trips or browser timers.
+
+# Seconds from start_game to the first tick (the page's 3-2-1 countdown)
+COUNTDOWN = 3.0
+
+
+def _caller_socket():
+    """
+    The websocket of the page whose call we're handling, or None outside
+    one. Eel handles each message in a greenlet spawned with
+    (message, websocket) as its arguments.
+    """
+    args = getattr(gevent.getcurrent(), 'args', ())
+    return args[1] if len(args) > 1 else None
+
+
+def _push_update(session, update):
+    """
+    Calls receive_update(update) on the session's page only, or
+    receive_frame(update) for a binary session. eel's own
+    eel.<function>() would go to every open page, so this sends the same
+    call message itself (with eel's internals, hence the pinned version in
+    requirements.txt). The page's reply doubles as a heartbeat that keeps
+    the session from being evicted as idle.
+    """
+    name = 'receive_frame' if session.binary else 'receive_update'
+    call = eel._call_object(name, [update])
+    call_id = call['call']
+    session_id = session.id
+
+    # Ids only, not the session: eel holds on to this until the page replies
+    def answered(_):
+        live = sessions.get(session_id)  # Marks the session as used
+        if live is not None:
+            live.unanswered.discard(call_id)
+
+    session.unanswered.add(call_id)
+    eel._call_return(call)(answered)
+    eel._repeated_send(session.client, eel._safe_json(call))
+
+
+def _advance(session, due):
     """
-    game = game_storage.get('main_game')
-    if not game:
-        return {'error': 'Game not started'}
+    Runs the session's `due` claimed ticks and returns the update to
+    push: a get_update() dict, or for a binary session a wire.py frame
+    as base64 (eel messages are JSON, so raw bytes can't go through).
+    """
+    game = session.game
+    tick_started = time.perf_counter()
+    _run_ticks(session, due)
+    with session.lock:
+        serialise_started = time.perf_counter()
+        if session.binary:
+            update = base64.b64encode(encode_frame(game, session.pushed_tick)).decode('ascii')
+        else:
+            update = game.get_update(session.pushed_tick)
+        session.pushed_tick = game.tick
+        finished = time.perf_counter()
+    tick_metrics.record('serialise', finished - serialise_started, game.grid_size)
+    tick_metrics.record('tick', finished - tick_started, game.grid_size)
+    return update
+
 
-    if game.game_over:
-        return game.get_state()
+def _tick_and_push(session, due):
+    """
+    Runs in its own greenlet per batch of ticks (see tick_loop), so one
+    session's bots thinking never holds up another session.
+    """
+    try:
+        update = _advance(session, due)
+        # Sent outside session.lock: sending can yield to other greenlets
+        _push_update(session, update)
+    except Exception as e:
+        print(f"Error ticking session {session.id}: {e}")
 
-    # Bot-Calling Logic (same as before)
-    bot_modules = game_storage.get('bot_modules_for_game', [])
-    current_state = game.get_state() 
 
-    for i in range(1, len(bot_modules)):
-        if current_state['players'][i]['is_alive']:
-            try:
-                bot_module = bot_modules[i]
-                move = bot_module.get_move(current_state, i)
-                if move:
-                    game.submit_move(i, move)
-            except Exception as e:
-                print(f"Error getting move from bot {i}: {e}")
+def tick_loop():
+    """
+    Runs forever in its own greenlet (see main): hands every session with
+    a page attached its due ticks (and the push) in a greenlet of their
+    own, then sleeps until the next session is due.
+    """
+    while True:
+        now = time.monotonic()
+        wake_at = now + sessions.tick_interval
+        for session in sessions.live():
+            if session.client is None or session.next_tick_at is None or session.game.game_over:
+                continue
+            if getattr(session.client, 'closed', False):
+                print(f"Page for session {session.id} closed, ending it")
+                sessions.end(session.id)
+                continue
+            due = session.claim_ticks(now)
+            if due:
+                eel.spawn(_tick_and_push, session, due)
+            # A session still busy with late ticks gets looked at next time round
+            if session.next_tick_at > now:
+                wake_at = min(wake_at, session.next_tick_at)
+        eel.sleep(max(0.0, wake_at - time.monotonic()))
 
-    game.update()
-    return game.get_state()
+
+def _page_closed(page, open_pages):
+    """
+    close_callback for server mode (--no-window): ends the sessions of
+    the page that just closed, instead of eel's default of exiting the
+    process once no page is left.
+    """
+    for session in sessions.live():
+        if session.client is not None and getattr(session.client, 'closed', False):
+            print(f"Page for session {session.id} closed, ending it")
+            sessions.end(session.id)
 
 
 # --- 5. Start the Application ---
-if __name__ == '__main__':
+def main(argv=None):
+    global sessions, bot_pool
+    parser = argparse.ArgumentParser(description="Run the Tron game server.")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-sessions', type=int, default=MAX_SESSIONS,
+                        help="most games this process hosts at once")
+    parser.add_argument('--no-window', action='store_true',
+                        help="just serve the game; players open http://HOST:PORT/index.html")
+    parser.add_argument('--bot-workers', type=int, default=DEFAULT_BOT_WORKERS,
+                        help="processes the bots think on in parallel (0: one after another, in-process)")
+    args = parser.parse_args(argv)
+
+    sessions = SessionManager(max_sessions=args.max_sessions, on_close=_forget_pushes)
+    # Threads the sessions' bot phases run on (see _run_tick), one per session at most
+    gevent.get_hub().threadpool.maxsize = args.max_sessions
+    if args.bot_workers > 0:
+        # Started before eel so the workers don't inherit its server
+        bot_pool = BotPool(args.bot_workers)
+
     print("Initializing Eel application...")
     # Initialize Eel
     eel.init('web') # 'web' is the folder with your index.html
+    eel.spawn(tick_loop)
     
     print("Starting Tron game... Close this window to quit.")
-    # Start the app. This opens the window.
-    eel.start('index.html', size=(1024, 768))
\ No newline at end of file
+    # Start the app. This opens the window (unless --no-window).
+    options = {'host': args.host, 'port': args.port}
+    if args.no_window:
+        # A server outlives its pages: a closing tab only ends its own game
+        options['mode'] = None
+        options['close_callback'] = _page_closed
+    try:
+        eel.start('index.html', size=(1024, 768), **options)
+    finally:
+        # Stop the bot threads, then the pool's workers and shared memory
+        sessions.close()
+        if bot_pool is not None:
+            bot_pool.close()
+            bot_pool = None
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
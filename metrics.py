@@ -0,0 +1,118 @@
+"""
+Tick latency metrics.
+
+TickMetrics keeps a rolling window of timings per tick phase and per bot,
+split by grid size, and reports p50/p95/p99 for each. Game.update and
+BotRunner record into it when one is attached; main.py exposes it to the
+UI through get_metrics() and simulate.py can write it to a file.
+
+Phases:
+    tick        whole game_tick / simulator step
+    get_state   building the state dict and BoardView for the bots
+    bots        all bot moves for the tick
+    move        Game.update step 1
+    collision   Game.update steps 2-4
+    serialise   building the update sent to the frontend
+Each bot's get_move is recorded separately under its name.
+"""
+import json
+from collections import deque
+
+DEFAULT_WINDOW = 1000
+
+
+def _nearest_rank(ordered, pct):
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class LatencyHistogram:
+    """
+    Rolling window of the last `window` samples (in seconds).
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0  # All-time number of samples, not just the window
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, pct):
+        if not self.samples:
+            return 0.0
+        return _nearest_rank(sorted(self.samples), pct)
+
+    def summary(self):
+        """
+        Percentiles in milliseconds, plus sample counts.
+        """
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {'count': self.count, 'window': 0}
+
+        return {
+            'count': self.count,
+            'window': len(ordered),
+            'p50_ms': _nearest_rank(ordered, 50) * 1000,
+            'p95_ms': _nearest_rank(ordered, 95) * 1000,
+            'p99_ms': _nearest_rank(ordered, 99) * 1000,
+            'max_ms': ordered[-1] * 1000,
+            'mean_ms': sum(ordered) / len(ordered) * 1000,
+        }
+
+
+class TickMetrics:
+    """
+    Histograms keyed by (grid size, phase) and (grid size, bot name).
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.phases = {}
+        self.bots = {}
+
+    def record(self, phase, seconds, grid_size):
+        key = (grid_size, phase)
+        histogram = self.phases.get(key)
+        if histogram is None:
+            histogram = self.phases[key] = LatencyHistogram(self.window)
+        histogram.add(seconds)
+
+    def record_bot(self, bot_name, seconds, grid_size):
+        key = (grid_size, bot_name)
+        histogram = self.bots.get(key)
+        if histogram is None:
+            histogram = self.bots[key] = LatencyHistogram(self.window)
+        histogram.add(seconds)
+
+    def snapshot(self):
+        """
+        JSON-friendly summary:
+            {grid_size: {'phases': {phase: summary}, 'bots': {name: summary}}}
+        (grid sizes become strings so this survives json.dumps / Eel)
+        """
+        result = {}
+        for group, histograms in (('phases', self.phases), ('bots', self.bots)):
+            # A snapshot of the keys: bots can record new ones from other threads
+            for (grid_size, name), histogram in list(histograms.items()):
+                entry = result.setdefault(str(grid_size), {'phases': {}, 'bots': {}})
+                entry[group][name] = histogram.summary()
+        return result
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2, sort_keys=True)
+
+    def print_report(self):
+        for grid_size, entry in sorted(self.snapshot().items(), key=lambda item: int(item[0])):
+            print(f"Grid {grid_size}x{grid_size}:")
+            for group in ('phases', 'bots'):
+                for name, summary in sorted(entry[group].items()):
+                    if not summary['window']:
+                        continue
+                    print(f"  {name:<14} p50 {summary['p50_ms']:8.3f} ms  "
+                          f"p95 {summary['p95_ms']:8.3f} ms  p99 {summary['p99_ms']:8.3f} ms  "
+                          f"(n={summary['count']})")
+
@@ -0,0 +1,251 @@
+"""
+Connected-region index over the free cells of a board.
+
+Cells only ever go from free to occupied, so regions only shrink or split.
+RegionIndex labels every free cell with the id of the region it belongs
+to and keeps each region's size. Claiming a cell is O(1) unless the cell
+could be a chokepoint; then the sides are flooded in lock-step and only
+the smaller pieces that broke off get relabelled.
+
+On huge boards a split between two big pieces can take a long flood to
+settle, so a RegionIndex can be given a split_budget: the most cells one
+split check may visit. Pieces smaller than the budget are always found;
+when the budget runs out the remaining pieces keep sharing a label, so a
+label may then cover several big regions (sizes stay exact per label).
+"""
+from array import array
+from collections import deque
+
+# Label of occupied cells
+BLOCKED = 0
+
+
+class RegionIndex:
+    """
+    labels[i] is the region id of free cell i (index = y * grid_size + x),
+    BLOCKED for occupied cells. sizes maps region id -> number of cells.
+    split_budget=None keeps the index exact (see the module docstring).
+    """
+
+    def __init__(self, grid_size, cells, split_budget=None):
+        self.grid_size = grid_size
+        self.split_budget = split_budget
+        self.labels = array('I', bytes(4 * grid_size * grid_size))
+        self.sizes = {}
+        self._next_label = 1
+        self._relabel_all(cells)
+
+    def _new_label(self):
+        label = self._next_label
+        self._next_label += 1
+        return label
+
+    def _relabel_all(self, cells):
+        """
+        Labels everything from scratch. Works on runs of free cells in each
+        row (found with bytes.find, so the per-cell work happens in C): a
+        run is joined to every run it touches in the row above, then each
+        group of joined runs becomes one region.
+        """
+        size = self.grid_size
+        runs = []    # (start index, end index) of each run
+        parent = []  # union-find over run numbers
+
+        def find(run):
+            while parent[run] != run:
+                parent[run] = parent[parent[run]]
+                run = parent[run]
+            return run
+
+        above = []
+        for y in range(size):
+            row_start = y * size
+            occupied = bytes(map(bool, cells[row_start:row_start + size]))
+            row = []
+            x = occupied.find(0)
+            while x != -1:
+                end = occupied.find(1, x)
+                if end == -1:
+                    end = size
+                run = len(runs)
+                runs.append((row_start + x, row_start + end))
+                parent.append(run)
+                row.append((x, end, run))
+                x = occupied.find(0, end)
+
+            # Runs in neighbouring rows touch if their x ranges overlap
+            i = j = 0
+            while i < len(above) and j < len(row):
+                above_start, above_end, above_run = above[i]
+                start, end, run = row[j]
+                if above_start < end and start < above_end:
+                    parent[find(above_run)] = find(run)
+                if above_end < end:
+                    i += 1
+                else:
+                    j += 1
+            above = row
+
+        labels = self.labels
+        label_of_root = {}
+        for run, (start, end) in enumerate(runs):
+            root = find(run)
+            label = label_of_root.get(root)
+            if label is None:
+                label = label_of_root[root] = self._new_label()
+                self.sizes[label] = 0
+            labels[start:end] = array('I', [label]) * (end - start)
+            self.sizes[label] += end - start
+
+    # --- Queries ---
+
+    def label_at(self, x, y):
+        return self.labels[y * self.grid_size + x]
+
+    def size_at(self, x, y):
+        """
+        Size of the region containing free cell (x, y); 0 if it's occupied.
+        """
+        return self.sizes.get(self.labels[y * self.grid_size + x], 0)
+
+    # --- Updates ---
+
+    def claim(self, index):
+        """
+        Marks a cell as occupied and splits its region if that cut it in two.
+        """
+        labels = self.labels
+        label = labels[index]
+        if label == BLOCKED:
+            return
+        labels[index] = BLOCKED
+        if self.sizes[label] == 1:
+            del self.sizes[label]
+            return
+        self.sizes[label] -= 1
+
+        seeds = self._ring_seeds(index)
+        if len(seeds) > 1:
+            self._split(label, seeds)
+
+    def _ring_seeds(self, index):
+        """
+        Cheap local test: walk the 8 cells around `index` in order. Free
+        neighbours on the same unbroken run of free ring cells are still
+        connected without going through `index`. Returns one neighbour per
+        run; if that's a single cell, nothing can have split.
+        """
+        size = self.grid_size
+        labels = self.labels
+        x, y = index % size, index // size
+        ring = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+
+        free = []
+        for dx, dy in ring:
+            rx, ry = x + dx, y + dy
+            free.append(0 <= rx < size and 0 <= ry < size and labels[ry * size + rx] != BLOCKED)
+        if all(free):
+            return [index - size]
+
+        # Ring positions 0, 2, 4, 6 are the 4-neighbours N, E, S, W
+        seeds = []
+        run_has_seed = False
+        start = free.index(False)
+        for step in range(1, 9):
+            i = (start + step) % 8
+            if not free[i]:
+                run_has_seed = False
+            elif i % 2 == 0 and not run_has_seed:
+                dx, dy = ring[i]
+                seeds.append((y + dy) * size + x + dx)
+                run_has_seed = True
+        return seeds
+
+    def _split(self, label, seeds):
+        """
+        Floods from each seed in lock-step. Searches that meet are merged;
+        a search that runs out of cells before meeting the rest is a piece
+        that broke off and gets a new label. Stops as soon as only one
+        search is left, so the cost is about the size of the smaller pieces.
+        """
+        labels = self.labels
+        size = self.grid_size
+        total = size * size
+        budget = self.split_budget
+        visited = 0
+        owner = {seed: i for i, seed in enumerate(seeds)}  # cell -> search that reached it first
+        parent = list(range(len(seeds)))
+        queues = {i: deque([seed]) for i, seed in enumerate(seeds)}
+        found = {i: [seed] for i, seed in enumerate(seeds)}
+
+        def root(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        while len(queues) > 1:
+            for search in list(queues):
+                if search not in queues:
+                    continue  # Merged into another search this round
+                queue = queues[search]
+                mine = found[search]
+                if not queue:
+                    # This piece is closed off: give it its own label
+                    new_label = self._new_label()
+                    for cell in mine:
+                        labels[cell] = new_label
+                    self.sizes[new_label] = len(mine)
+                    self.sizes[label] -= len(mine)
+                    del queues[search]
+                    del found[search]
+                    if len(queues) <= 1:
+                        break
+                    continue
+
+                visited += 1
+                if budget is not None and visited > budget:
+                    return  # Out of budget: the pieces left keep sharing the old label
+                cell = queue.popleft()
+                x = cell % size
+                # Up, down, left, right; -1 where that's off the board
+                for n in (cell - size, cell + size,
+                          cell - 1 if x > 0 else -1, cell + 1 if x < size - 1 else -1):
+                    if n < 0 or n >= total or labels[n] != label:
+                        continue
+                    other = owner.get(n)
+                    if other is None:
+                        owner[n] = search
+                        queue.append(n)
+                        mine.append(n)
+                        continue
+                    if other == search:
+                        continue  # Our own cell; searches still running are their own roots
+                    other = root(other)
+                    if other != search:
+                        # Two searches met: same piece after all
+                        parent[other] = search
+                        queue.extend(queues.pop(other))
+                        mine.extend(found.pop(other))
+                        if len(queues) <= 1:
+                            break
+
+
+def heads_by_region(grid_size, labels, heads, alive):
+    """
+    Which players' heads touch each region: {label: [player ids]}.
+    heads and alive are indexed by player id.
+    """
+    touching = {}
+    for player_id, (x, y) in enumerate(heads):
+        if not alive[player_id] or not (0 <= x < grid_size and 0 <= y < grid_size):
+            continue
+        seen = set()
+        for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+            if not (0 <= nx < grid_size and 0 <= ny < grid_size):
+                continue
+            label = labels[ny * grid_size + nx]
+            if label and label not in seen:
+                seen.add(label)
+                touching.setdefault(label, []).append(player_id)
+    return touching
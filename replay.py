@@ -0,0 +1,302 @@
+"""
+Compact binary game replays.
+
+A replay stores the player config, the seed (if known), the spawn points,
+and for every tick one 2-bit direction code per player that moved. Every
+`keyframe_interval` ticks it also stores a full snapshot, so a reader can
+jump to any tick by restoring the nearest keyframe and replaying at most
+that many ticks, instead of starting from tick 0. No bots are needed to
+play a replay back: the moves are the directions the players actually took.
+
+File layout (little-endian):
+    header   MAGIC, version (u8), metadata length (u32), metadata (JSON)
+    blocks   kind (1 byte), tick (u32), payload length (u32), payload (zlib)
+        b'M'  moves for every tick since the previous b'M' block, up to and
+              including `tick`: per tick, the moving players' direction
+              codes 4 to a byte, padded to a whole byte
+        b'K'  snapshot of the game after `tick` ticks
+        b'E'  end of game: JSON with the winner and every player's death tick
+Blocks are written as the game runs (moves are flushed at every keyframe),
+so a replay cut off mid-game is still readable up to its last block.
+
+Example:
+    python simulate.py --bots gemini_bot claude_bot --seed 1 --replays replays/
+    python replay.py replays/game-0.tronr --tick 120
+"""
+import argparse
+import json
+import struct
+import zlib
+from array import array
+
+from game import Game, DIRECTIONS
+from regions import RegionIndex
+
+MAGIC = b'TRNR'
+REPLAY_VERSION = 1
+DEFAULT_KEYFRAME_INTERVAL = 100
+
+_HEADER = struct.Struct('<4sBI')
+_BLOCK = struct.Struct('<cII')
+_GAME = struct.Struct('<?i')           # game_over, winner
+_PLAYER = struct.Struct('<iiBB?iI')    # x, y, direction, next_direction, alive, death_tick, trail length
+
+# Winner encoding in keyframes
+_NO_WINNER = -1
+_DRAW = -2
+
+
+def _moved_this_tick(player, tick):
+    # Alive at the start of the tick: still alive, or died during it
+    return player.death_tick is None or player.death_tick == tick
+
+
+def _pack_codes(codes):
+    packed = bytearray((len(codes) + 3) // 4)
+    for i, code in enumerate(codes):
+        packed[i >> 2] |= code << ((i & 3) * 2)
+    return packed
+
+
+def _encode_keyframe(game):
+    if game.winner is None:
+        winner = _NO_WINNER
+    elif game.winner == 'DRAW':
+        winner = _DRAW
+    else:
+        winner = game.winner
+
+    parts = [_GAME.pack(game.game_over, winner)]
+    for p in game.players:
+        death_tick = -1 if p.death_tick is None else p.death_tick
+        parts.append(_PLAYER.pack(p.x, p.y, p.direction, p.next_direction,
+                                  p.is_alive, death_tick, len(p.trail)))
+        parts.append(p.trail.tobytes())
+    return b''.join(parts)
+
+
+# --- 1. Writing ---
+class ReplayWriter:
+    """
+    Records a game to `path`. Attach it before the first tick:
+        game.replay = ReplayWriter(path, game)
+    and Game.update() feeds it. The file is closed when the game ends;
+    call close() to finish a replay of a game that was abandoned.
+    """
+
+    def __init__(self, path, game, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        if game.tick != 0:
+            raise ValueError("A replay has to start at tick 0")
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+
+        self.keyframe_interval = keyframe_interval
+        self._moves = bytearray()
+        self._moves_until = 0  # Last tick in self._moves
+        self._file = open(path, 'wb')
+
+        meta = {
+            'seed': game.seed,
+            'grid_size': game.grid_size,
+            'players': [{'name': p.name, 'color': p.color} for p in game.players],
+            'spawns': [[p.x, p.y, p.direction] for p in game.players],
+            'massive': game.massive,
+            'keyframe_interval': keyframe_interval,
+        }
+        meta_bytes = json.dumps(meta).encode()
+        self._file.write(_HEADER.pack(MAGIC, REPLAY_VERSION, len(meta_bytes)))
+        self._file.write(meta_bytes)
+
+    def _write_block(self, kind, tick, payload):
+        payload = zlib.compress(payload)
+        self._file.write(_BLOCK.pack(kind, tick, len(payload)))
+        self._file.write(payload)
+
+    def _flush_moves(self):
+        if self._moves:
+            self._write_block(b'M', self._moves_until, bytes(self._moves))
+            self._moves.clear()
+
+    def record(self, game):
+        """
+        Appends the moves of the tick that just ran. Called by Game.update().
+        """
+        if self._file is None:
+            return
+        tick = game.tick
+        self._moves += _pack_codes([p.direction for p in game.players
+                                    if _moved_this_tick(p, tick)])
+        self._moves_until = tick
+
+        if game.game_over:
+            self._flush_moves()
+            self._write_block(b'E', tick, json.dumps({
+                'winner': game.winner,
+                'death_ticks': [p.death_tick for p in game.players],
+            }).encode())
+            self.close()
+        elif tick % self.keyframe_interval == 0:
+            self._flush_moves()
+            self._write_block(b'K', tick, _encode_keyframe(game))
+
+    def close(self):
+        if self._file is None:
+            return
+        self._flush_moves()
+        self._file.close()
+        self._file = None
+
+
+# --- 2. Reading ---
+class ReplayReader:
+    """
+    Loads a replay written by ReplayWriter. game_at(tick) rebuilds the game
+    as it was after that many ticks; death_ticks and winner tell you where
+    to look.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        magic, version, meta_len = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"{path} is replay version {version}, expected {REPLAY_VERSION}")
+        offset = _HEADER.size
+        self.meta = json.loads(data[offset:offset + meta_len])
+        offset += meta_len
+
+        self.seed = self.meta['seed']
+        self.grid_size = self.meta['grid_size']
+        self.player_config = self.meta['players']
+        self.winner = None
+        self.death_ticks = None
+        self.last_tick = 0
+
+        # Only the block headers are read here; payloads are decompressed on demand
+        self._keyframes = {}    # tick -> payload
+        self._move_blocks = []  # (last tick in block, payload), in order
+        while offset + _BLOCK.size <= len(data):
+            kind, tick, length = _BLOCK.unpack_from(data, offset)
+            offset += _BLOCK.size
+            payload = data[offset:offset + length]
+            if len(payload) < length:
+                break  # Cut off mid-write
+            offset += length
+
+            if kind == b'M':
+                self._move_blocks.append((tick, payload))
+                self.last_tick = max(self.last_tick, tick)
+            elif kind == b'K':
+                self._keyframes[tick] = payload
+            elif kind == b'E':
+                end = json.loads(zlib.decompress(payload))
+                self.winner = end['winner']
+                self.death_ticks = end['death_ticks']
+                self.last_tick = tick
+
+    @property
+    def finished(self):
+        return self.death_ticks is not None
+
+    def _restore(self, tick):
+        """
+        The game after `tick` ticks, from the spawns (tick 0) or a keyframe.
+        """
+        spawns = [tuple(spawn) for spawn in self.meta['spawns']]
+        game = Game(self.grid_size, self.player_config, spawns=spawns, seed=self.seed,
+                    massive=self.meta.get('massive', False))
+        if tick == 0:
+            return game
+
+        data = zlib.decompress(self._keyframes[tick])
+        game_over, winner = _GAME.unpack_from(data, 0)
+        offset = _GAME.size
+        game.tick = tick
+        game.game_over = game_over
+        game.winner = {_NO_WINNER: None, _DRAW: 'DRAW'}.get(winner, winner)
+
+        split_budget = game.regions.split_budget
+        game.regions = None  # Rebuilt once below instead of per cell
+        size = self.grid_size
+        for p in game.players:
+            x, y, direction, next_direction, alive, death_tick, trail_len = \
+                _PLAYER.unpack_from(data, offset)
+            offset += _PLAYER.size
+            trail = array('I')
+            trail.frombytes(data[offset:offset + trail_len * trail.itemsize])
+            offset += trail_len * trail.itemsize
+
+            p.x, p.y = x, y
+            p.direction, p.next_direction = direction, next_direction
+            p.is_alive = alive
+            p.death_tick = None if death_tick < 0 else death_tick
+            p.trail = trail
+
+            # A crash cell on the board is the last trail entry but was never claimed
+            claimed = trail
+            if not alive and 0 <= x < size and 0 <= y < size:
+                claimed = trail[:-1]
+            for index in claimed:
+                game._occupy(index % size, index // size, p.id)
+        game.regions = RegionIndex(size, game._grid, split_budget)
+        return game
+
+    def game_at(self, tick):
+        """
+        A Game as it was after `tick` ticks (clamped to the end of the replay).
+        """
+        tick = max(0, min(tick, self.last_tick))
+        start = max([t for t in self._keyframes if t <= tick], default=0)
+        game = self._restore(start)
+
+        # Move blocks end on keyframe ticks, so the ones after `start`
+        # pick up exactly at tick start + 1
+        moves = b''.join(zlib.decompress(payload)
+                         for last, payload in self._move_blocks if last > start)
+        offset = 0
+        while game.tick < tick and not game.game_over:
+            moving = [p for p in game.players if p.is_alive]
+            width = (len(moving) + 3) // 4
+            if offset + width > len(moves):
+                raise ValueError(f"Replay has no moves for tick {game.tick + 1}")
+            for i, p in enumerate(moving):
+                p.next_direction = (moves[offset + (i >> 2)] >> ((i & 3) * 2)) & 3
+            offset += width
+            game.update()
+        return game
+
+
+# --- 3. Command line ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect a Tron replay file.")
+    parser.add_argument('path')
+    parser.add_argument('--tick', type=int, default=None,
+                        help="print the position after this tick")
+    args = parser.parse_args(argv)
+
+    replay = ReplayReader(args.path)
+    print(f"{args.path}: {len(replay.player_config)} players on "
+          f"{replay.grid_size}x{replay.grid_size}, seed {replay.seed}")
+    if replay.finished:
+        winner = replay.winner
+        if winner != 'DRAW':
+            winner = replay.player_config[winner]['name']
+        print(f"  winner: {winner}, {replay.last_tick} ticks")
+        for config, death_tick in zip(replay.player_config, replay.death_ticks):
+            print(f"  {config['name']:<14} {'survived' if death_tick is None else f'died on tick {death_tick}'}")
+    else:
+        print(f"  unfinished, readable up to tick {replay.last_tick}")
+
+    if args.tick is not None:
+        game = replay.game_at(args.tick)
+        print(f"After tick {game.tick}:")
+        for p in game.players:
+            state = 'alive' if p.is_alive else f'dead (tick {p.death_tick})'
+            print(f"  {p.name:<14} at ({p.x}, {p.y}) heading {DIRECTIONS[p.direction]}, {state}")
+
+
+if __name__ == '__main__':
+    main()
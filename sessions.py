@@ -0,0 +1,200 @@
+"""
+Game sessions: many concurrent games in one server process.
+
+SessionManager hosts games keyed by a random session id. Each session
+keeps its own tick schedule, so a game advances at its own fixed rate
+whoever drives it: the server's tick loop (main.py), or a client polling. Sessions nobody has
+touched for idle_timeout seconds are evicted, and at most max_sessions
+can be live at once, so a single process per core can serve dozens of
+players with a bounded amount of work.
+"""
+import secrets
+import threading
+import time
+
+# Live sessions per process
+MAX_SESSIONS = 64
+# Seconds without a client call before a session is evicted
+IDLE_TIMEOUT = 60.0
+# Seconds between ticks of one game (the UI's 10 ticks per second)
+TICK_INTERVAL = 0.1
+# A poll may run a tick up to this fraction of an interval early, so
+# polling jitter doesn't skip frames; the schedule stays anchored, so
+# the long-run rate can't drift above 1 / TICK_INTERVAL.
+TICK_SLACK = 0.25
+# Most ticks one poll may run to catch up; a longer backlog is dropped
+MAX_CATCHUP_TICKS = 3
+
+
+class Session:
+    """
+    One hosted game: the Game, its BotRunner and its tick schedule.
+    Hold `lock` while ticking or reading the game, or claim the ticks
+    with claim_ticks() to run them without it. client is whatever the
+    server pushes updates to (None if nothing is listening), and
+    pushed_tick the last tick it was sent, unanswered the ids of pushes
+    it hasn't replied to yet. binary clients get wire.py frames instead
+    of JSON updates.
+    """
+
+    def __init__(self, session_id, game, runner, tick_interval, now):
+        self.id = session_id
+        self.game = game
+        self.runner = runner
+        self.tick_interval = tick_interval
+        self.lock = threading.Lock()
+        self.last_seen = now
+        self.next_tick_at = None  # Set by start() or the first ticks_due(), so the clock starts when play does
+        self.client = None
+        self.pushed_tick = None
+        self.unanswered = set()
+        self.binary = False
+        self.ticking = False  # Ticks claimed and not yet released
+        self.closed = False
+
+    def start(self, at):
+        """
+        Schedules the first tick for time `at` (same clock as ticks_due).
+        """
+        self.next_tick_at = at
+
+    def touch(self, now):
+        self.last_seen = now
+
+    def ticks_due(self, now):
+        """
+        How many ticks to run now to keep to the schedule (0 to MAX_CATCHUP_TICKS),
+        and moves the schedule past them.
+        """
+        interval = self.tick_interval
+        if self.next_tick_at is None:
+            self.next_tick_at = now + interval
+            return 1
+
+        due = 0
+        while due < MAX_CATCHUP_TICKS and now + interval * TICK_SLACK >= self.next_tick_at:
+            self.next_tick_at += interval
+            due += 1
+        if now >= self.next_tick_at:
+            # Too far behind (e.g. the client was suspended): drop the backlog
+            self.next_tick_at = now + interval
+        return due
+
+    def claim_ticks(self, now):
+        """
+        ticks_due(), for a caller that runs the ticks without holding
+        lock (e.g. while the bots think on another thread): the session
+        counts as ticking until release(). Returns 0 while it already is,
+        or once it's closed, so no two callers ever tick it at once.
+        """
+        with self.lock:
+            if self.ticking or self.closed:
+                return 0
+            due = self.ticks_due(now)
+            self.ticking = due > 0
+            return due
+
+    def release(self):
+        """
+        Ends a claim_ticks(). Closes the runner if the session was closed
+        in the meantime.
+        """
+        self.ticking = False
+        if self.closed:
+            self.runner.close()
+
+    def close(self):
+        self.closed = True
+        if not self.ticking:  # Else release() closes the runner once the ticks are done
+            self.runner.close()
+
+
+class SessionManager:
+    """
+    create() starts hosting a game and returns its Session; get() looks one
+    up by id and marks it as used. on_close(session), if given, is called
+    for every session that ends, however it ends. clock is injectable for
+    testing.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, idle_timeout=IDLE_TIMEOUT,
+                 tick_interval=TICK_INTERVAL, clock=time.monotonic, on_close=None):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.tick_interval = tick_interval
+        self.clock = clock
+        self.on_close = on_close
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._next_sweep = clock() + idle_timeout / 4
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def create(self, game, runner):
+        """
+        Hosts `game` (driven by `runner`, a bot_runner.BotRunner).
+        Raises RuntimeError if max_sessions are already live.
+        """
+        self.evict_idle()
+        now = self.clock()
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                runner.close()
+                raise RuntimeError(f"Server is full ({self.max_sessions} live games), try again later")
+            session_id = secrets.token_urlsafe(12)
+            session = Session(session_id, game, runner, self.tick_interval, now)
+            self._sessions[session_id] = session
+        return session
+
+    def get(self, session_id):
+        """
+        The live Session with this id, or None if it never existed or was evicted.
+        """
+        now = self.clock()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.touch(now)
+        if now >= self._next_sweep:
+            self.evict_idle()
+        return session
+
+    def live(self):
+        """
+        A snapshot list of the live sessions.
+        """
+        with self._lock:
+            return list(self._sessions.values())
+
+    def end(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._close(session)
+
+    def evict_idle(self):
+        """
+        Ends every session idle for longer than idle_timeout and returns their ids.
+        """
+        now = self.clock()
+        self._next_sweep = now + self.idle_timeout / 4
+        with self._lock:
+            idle = [sid for sid, s in self._sessions.items()
+                    if now - s.last_seen > self.idle_timeout]
+            evicted = [self._sessions.pop(sid) for sid in idle]
+        for session in evicted:
+            print(f"Evicting idle session {session.id} (tick {session.game.tick})")
+            self._close(session)
+        return idle
+
+    def _close(self, session):
+        session.close()
+        if self.on_close is not None:
+            self.on_close(session)
+
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions = {}
+        for session in sessions:
+            self._close(session)
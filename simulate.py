@@ -0,0 +1,195 @@
+"""
+Headless simulator: plays bot-only matches as fast as possible,
+with no browser and no eel.
+
+Example:
+    python simulate.py --bots gemini_bot claude_bot --games 100 --seed 1
+    python simulate.py --massive --seed 1
+"""
+import argparse
+import os
+import time
+
+from game import Game, grid_size_for_players
+from bot_runner import BOT_CONFIG, AVAILABLE_BOT_NAMES, BotRunner
+from bot_pool import BotPool, ParallelBotRunner
+from metrics import TickMetrics
+from replay import ReplayWriter
+
+# --massive preset: MASSIVE_PLAYERS bots on a MASSIVE_GRID_SIZE arena in
+# massive mode (see Game). Only bots with a bounded cost per move are
+# cycled in; claude_bot, deepseek_bot and qwen_bot still work there but
+# each costs far more per move.
+MASSIVE_PLAYERS = 256
+MASSIVE_GRID_SIZE = 1000
+MASSIVE_BOTS = ['gemini_bot', 'chatgpt_bot', 'grok_bot', 'meta_bot']
+
+
+def massive_bot_names(count=MASSIVE_PLAYERS):
+    return [MASSIVE_BOTS[i % len(MASSIVE_BOTS)] for i in range(count)]
+
+
+def build_player_config(bot_names):
+    """
+    Turns a list of bot names into (player_config, bot_modules)
+    in the same format main.start_game uses.
+    """
+    player_config = []
+    bot_modules = []
+    for bot_name in bot_names:
+        bot_info = BOT_CONFIG[bot_name]
+        player_config.append({'name': bot_name, 'color': bot_info['color']})
+        bot_modules.append(bot_info['module'])
+    return player_config, bot_modules
+
+
+def play_match(bot_names, grid_size=None, seed=None, move_timeout=None, metrics=None,
+               replay_path=None, massive=False, bot_pool=None):
+    """
+    Plays one bot-only game to the end and returns a result dict:
+        {'winner': name or 'DRAW', 'ticks': int,
+         'survival': [ticks each player stayed alive],
+         'overruns': [missed move deadlines, see BotRunner]}
+    Pass a metrics.TickMetrics as metrics to record tick latencies,
+    and a replay_path to record the game (see replay.py).
+    massive=True plays in the large-arena mode (see Game).
+    With a bot_pool.BotPool as bot_pool, the bots think in parallel on its workers.
+    """
+    if grid_size is None:
+        grid_size = grid_size_for_players(len(bot_names))
+
+    player_config, bot_modules = build_player_config(bot_names)
+    game = Game(grid_size, player_config, seed=seed, massive=massive)
+    game.metrics = metrics
+    if replay_path:
+        game.replay = ReplayWriter(replay_path, game)
+    if bot_pool is not None:
+        runner = ParallelBotRunner(bot_pool, bot_modules, move_timeout, metrics)
+    else:
+        runner = BotRunner(bot_modules, move_timeout, metrics)
+
+    ticks = 0
+    survival = [0] * len(bot_names)
+    while not game.game_over:
+        if metrics:
+            tick_started = time.perf_counter()
+        runner.run_turns(game)
+        game.update()
+        if metrics:
+            metrics.record('tick', time.perf_counter() - tick_started, grid_size)
+        ticks += 1
+        for player in game.players:
+            if player.is_alive:
+                survival[player.id] = ticks
+    runner.close()
+
+    if game.winner == 'DRAW':
+        winner = 'DRAW'
+    else:
+        winner = game.players[game.winner].name
+
+    return {
+        'winner': winner,
+        'ticks': ticks,
+        'survival': survival,
+        'overruns': runner.overruns,
+    }
+
+
+def run_matches(bot_names, grid_size=None, seed=None, games=1, move_timeout=None,
+                metrics=None, replay_dir=None, massive=False, bot_pool=None):
+    """
+    Plays `games` matches back to back and returns a summary with
+    win counts and throughput (games/sec and ticks/sec).
+    Match i uses seed + i so a run is reproducible from its base seed.
+    With replay_dir, match i is recorded to replay_dir/game-<i>.tronr.
+    """
+    if replay_dir:
+        os.makedirs(replay_dir, exist_ok=True)
+
+    wins = {name: 0 for name in bot_names}
+    wins['DRAW'] = 0
+    total_ticks = 0
+    overruns = 0
+
+    start = time.perf_counter()
+    for i in range(games):
+        match_seed = None if seed is None else seed + i
+        replay_path = os.path.join(replay_dir, f"game-{i}.tronr") if replay_dir else None
+        result = play_match(bot_names, grid_size, match_seed, move_timeout, metrics,
+                            replay_path, massive, bot_pool)
+        wins[result['winner']] += 1
+        total_ticks += result['ticks']
+        overruns += len(result['overruns'])
+    elapsed = time.perf_counter() - start
+
+    return {
+        'games': games,
+        'ticks': total_ticks,
+        'seconds': elapsed,
+        'games_per_sec': games / elapsed if elapsed else 0.0,
+        'ticks_per_sec': total_ticks / elapsed if elapsed else 0.0,
+        'wins': wins,
+        'overruns': overruns,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run bot-only Tron matches without the UI.")
+    parser.add_argument('--bots', nargs='+', default=None,
+                        choices=AVAILABLE_BOT_NAMES, metavar='BOT',
+                        help="bot names, one per player (may repeat; default: one of each)")
+    parser.add_argument('--grid-size', type=int, default=None,
+                        help="arena size (default: same as the UI for this player count)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--games', type=int, default=1)
+    parser.add_argument('--move-timeout', type=float, default=None,
+                        help="seconds each bot gets per move (default: no limit)")
+    parser.add_argument('--metrics', metavar='PATH', default=None,
+                        help="record tick/bot latency percentiles and write them to PATH as JSON")
+    parser.add_argument('--replays', metavar='DIR', default=None,
+                        help="record every game to DIR/game-<i>.tronr (see replay.py)")
+    parser.add_argument('--bot-workers', type=int, default=0,
+                        help="run the bots in parallel on this many worker processes (see bot_pool.py)")
+    parser.add_argument('--massive', action='store_true',
+                        help=f"large-arena preset: {MASSIVE_PLAYERS} bots on "
+                             f"{MASSIVE_GRID_SIZE}x{MASSIVE_GRID_SIZE} (--bots and --grid-size override)")
+    args = parser.parse_args(argv)
+
+    if args.massive:
+        if args.bots is None:
+            args.bots = massive_bot_names()
+        if args.grid_size is None:
+            args.grid_size = MASSIVE_GRID_SIZE
+    elif args.bots is None:
+        args.bots = AVAILABLE_BOT_NAMES
+
+    if len(args.bots) < 2:
+        parser.error("need at least 2 bots")
+
+    metrics = TickMetrics() if args.metrics else None
+    bot_pool = BotPool(args.bot_workers) if args.bot_workers > 0 else None
+    try:
+        summary = run_matches(args.bots, args.grid_size, args.seed, args.games,
+                              args.move_timeout, metrics, args.replays, args.massive, bot_pool)
+    finally:
+        if bot_pool is not None:
+            bot_pool.close()
+
+    print(f"Played {summary['games']} games ({summary['ticks']} ticks) "
+          f"in {summary['seconds']:.2f}s")
+    print(f"  {summary['games_per_sec']:.1f} games/sec, "
+          f"{summary['ticks_per_sec']:.0f} ticks/sec")
+    if args.move_timeout is not None:
+        print(f"  {summary['overruns']} missed move deadlines")
+    for name, count in sorted(summary['wins'].items(), key=lambda item: -item[1]):
+        print(f"  {name:<14} {count}")
+
+    if metrics:
+        metrics.print_report()
+        metrics.write_json(args.metrics)
+        print(f"Metrics written to {args.metrics}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Spawn placement.
+
+plan_spawns picks start cells that keep SPAWN_MARGIN cells from the walls
+and are at least SPAWN_MIN_DIST apart. Spacing checks go through a bucket
+grid, so each one looks at a handful of nearby points instead of every
+spawn so far. Sparse layouts (a few hundred players on a huge arena) are
+placed by plain dart throwing, in time linear in the player count. Dense
+ones use Poisson-disk sampling (Bridson's algorithm), roughly linear in
+the arena area. If sampling comes up short a few times it falls back to
+a hexagonal lattice of candidates (cached per arena), and if even that
+can't fit everyone it raises ValueError rather than placing players
+unsafely.
+"""
+import math
+from functools import lru_cache
+
+# Spawn rules: min cells from the wall, and min distance between players.
+SPAWN_MARGIN = 5
+SPAWN_MIN_DIST = 10
+
+# Random cells tried per spawn by dart throwing before switching to Bridson
+DART_TRIES = 30
+# Candidates Bridson's algorithm tries around each point before retiring it
+SAMPLE_TRIES = 30
+# Full sampling runs before falling back to the lattice
+SAMPLE_ATTEMPTS = 4
+
+
+class _Buckets:
+    """
+    Points bucketed into min_dist x min_dist squares, so any point closer
+    than min_dist to (x, y) is in one of the 9 buckets around it.
+    """
+
+    def __init__(self, min_dist):
+        self.min_dist = min_dist
+        self.min_dist_sq = min_dist * min_dist
+        self.buckets = {}
+
+    def fits(self, x, y):
+        bx, by = x // self.min_dist, y // self.min_dist
+        for nbx in (bx - 1, bx, bx + 1):
+            for nby in (by - 1, by, by + 1):
+                for (px, py) in self.buckets.get((nbx, nby), ()):
+                    if (x - px) ** 2 + (y - py) ** 2 < self.min_dist_sq:
+                        return False
+        return True
+
+    def add(self, x, y):
+        self.buckets.setdefault((x // self.min_dist, y // self.min_dist), []).append((x, y))
+
+
+def _dart_throw(low, high, min_dist, count, rng):
+    """
+    Up to count * DART_TRIES uniformly random cells, keeping each one that
+    fits. Returns the spawns, or None if it didn't get `count` of them.
+    """
+    buckets = _Buckets(min_dist)
+    points = []
+    for _ in range(count * DART_TRIES):
+        x, y = rng.randint(low, high), rng.randint(low, high)
+        if buckets.fits(x, y):
+            buckets.add(x, y)
+            points.append((x, y))
+            if len(points) == count:
+                return points
+    return None
+
+
+def _poisson_disk(low, high, min_dist, rng):
+    """
+    Bridson's algorithm on the integer cells low..high (inclusive, both axes).
+    Returns a list of points, each at least min_dist from all the others,
+    packed until no more fit near any of them.
+    """
+    buckets = _Buckets(min_dist)
+    first = (rng.randint(low, high), rng.randint(low, high))
+    buckets.add(*first)
+    points = [first]
+    active = [first]
+
+    while active:
+        slot = rng.randrange(len(active))
+        ax, ay = active[slot]
+        for _ in range(SAMPLE_TRIES):
+            # Uniform over the annulus [min_dist, 2 * min_dist) around the active point
+            radius = min_dist * math.sqrt(1 + 3 * rng.random())
+            angle = rng.random() * 2 * math.pi
+            x = round(ax + radius * math.cos(angle))
+            y = round(ay + radius * math.sin(angle))
+            if low <= x <= high and low <= y <= high and buckets.fits(x, y):
+                buckets.add(x, y)
+                points.append((x, y))
+                active.append((x, y))
+                break
+        else:
+            # Nothing fits around this one any more
+            active[slot] = active[-1]
+            active.pop()
+    return points
+
+
+@lru_cache(maxsize=64)
+def spawn_lattice(grid_size, margin=SPAWN_MARGIN, min_dist=SPAWN_MIN_DIST):
+    """
+    The densest fixed layout we try: a hexagonal lattice over the allowed
+    area, as a tuple of (x, y). Cached, since it only depends on the arena.
+    """
+    low, high = margin, grid_size - 1 - margin
+    if high < low:
+        return ()
+    row_step = math.ceil(min_dist * math.sqrt(3) / 2)
+    buckets = _Buckets(min_dist)
+    points = []
+    for row, y in enumerate(range(low, high + 1, row_step)):
+        offset = min_dist // 2 if row % 2 else 0
+        for x in range(low + offset, high + 1, min_dist):
+            # Rounding can pull neighbouring rows a bit close; skip those
+            if buckets.fits(x, y):
+                buckets.add(x, y)
+                points.append((x, y))
+    return tuple(points)
+
+
+def plan_spawns(grid_size, count, rng, margin=SPAWN_MARGIN, min_dist=SPAWN_MIN_DIST):
+    """
+    Returns `count` (x, y) spawn cells, in random order, each at least
+    `margin` cells from the walls and `min_dist` from each other.
+    rng is a random.Random. Raises ValueError if they can't fit.
+    """
+    low, high = margin, grid_size - 1 - margin
+    if count == 0:
+        return []
+    if high < low:
+        raise ValueError(f"A {grid_size}x{grid_size} arena has no room inside a "
+                         f"{margin}-cell spawn margin")
+
+    points = _dart_throw(low, high, min_dist, count, rng)
+    if points is not None:
+        return points
+
+    for _ in range(SAMPLE_ATTEMPTS):
+        points = _poisson_disk(low, high, min_dist, rng)
+        if len(points) >= count:
+            return rng.sample(points, count)
+
+    points = spawn_lattice(grid_size, margin, min_dist)
+    if len(points) >= count:
+        return rng.sample(points, count)
+
+    raise ValueError(
+        f"Can't fit {count} spawns {min_dist} apart in a {grid_size}x{grid_size} arena "
+        f"with a {margin}-cell margin (room for about {len(points)}); "
+        "use a bigger grid"
+    )
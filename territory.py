@@ -0,0 +1,118 @@
+"""
+Voronoi territory: which free cells each player can reach first.
+
+compute_territory runs one breadth-first search from every living head at
+once. A free cell belongs to the player whose head is strictly closest
+(in steps through free cells); cells two or more players reach at the
+same distance are contested, and so is everything only reachable through
+them at that same distance. The search advances a whole level at a time
+on flat numpy arrays, so the per-cell work happens in C and a tick on a
+100x100 or bigger board stays cheap.
+
+Bots get it through BoardView.territory(), which computes it once per
+tick and shares it between every bot that reads the board.
+"""
+import numpy as np
+
+# owner / distance of cells no living head can reach (and of occupied cells)
+UNREACHED = -1
+# owner of cells two or more players reach at the same distance
+CONTESTED = -2
+
+
+class Territory:
+    """
+    owner[i] is the id of the player that reaches free cell i first,
+    CONTESTED or UNREACHED; distance[i] is how many steps that takes
+    (UNREACHED if nobody gets there). Both are flat numpy int32 arrays
+    (index = y * grid_size + x). counts[player id] is how many cells
+    each player owns, contested the indexes of the contested cells.
+    """
+    __slots__ = ('grid_size', 'owner', 'distance', 'counts', 'contested')
+
+    def __init__(self, grid_size, owner, distance, counts, contested):
+        self.grid_size = grid_size
+        self.owner = owner
+        self.distance = distance
+        self.counts = counts
+        self.contested = contested
+
+    def owner_at(self, x, y):
+        """
+        Player id that reaches (x, y) first, or None if nobody owns it.
+        """
+        owner = int(self.owner[y * self.grid_size + x])
+        return owner if owner >= 0 else None
+
+    def distance_at(self, x, y):
+        """
+        Steps from the nearest head to (x, y), or None if no head reaches it.
+        """
+        distance = int(self.distance[y * self.grid_size + x])
+        return distance if distance >= 0 else None
+
+
+def _flat(cells):
+    """
+    The occupancy grid as a numpy array, whatever it's stored in
+    (bytes, bytearray, array('H') or a memoryview of one).
+    """
+    view = memoryview(cells)
+    return np.frombuffer(view, dtype=np.uint8 if view.itemsize == 1 else np.uint16)
+
+
+def compute_territory(grid_size, cells, heads, alive):
+    """
+    The Territory of every living player. cells is the flat occupancy
+    grid (0 = free); heads and alive are indexed by player id. A head
+    doesn't have to be on an occupied cell, so a bot can score a move by
+    passing its head where the move would take it.
+    """
+    size = grid_size
+    total = size * size
+    free = _flat(cells) == 0  # A copy, so no view of `cells` is kept
+    owner = np.full(total, UNREACHED, dtype=np.int32)
+    distance = np.full(total, UNREACHED, dtype=np.int32)
+    slot = np.empty(total, dtype=np.int64)  # Scratch space for de-duplicating cells
+
+    sources = [(y * size + x, player_id) for player_id, (x, y) in enumerate(heads)
+               if alive[player_id] and 0 <= x < size and 0 <= y < size]
+    frontier = np.array([cell for cell, _ in sources], dtype=np.int64)
+    frontier_owner = np.array([player_id for _, player_id in sources], dtype=np.int32)
+    # Nobody walks through a head, even one put on a free cell to try a move
+    free[frontier] = False
+
+    level = 0
+    while frontier.size:
+        level += 1
+        # Every free, unreached neighbour of the frontier, with who it came from
+        x = frontier % size
+        steps = (
+            (frontier >= size, -size),
+            (frontier < total - size, size),
+            (x > 0, -1),
+            (x < size - 1, 1),
+        )
+        targets = np.concatenate([frontier[ok] + offset for ok, offset in steps])
+        claims = np.concatenate([frontier_owner[ok] for ok, _ in steps])
+        new = free[targets] & (distance[targets] == UNREACHED)
+        targets = targets[new]
+        claims = claims[new]
+        if not targets.size:
+            break
+
+        # Write every claim; where a later claim overwrote a different one
+        # the cell is contested. Then keep one copy of each cell (the last
+        # write to `slot` wins) as the next frontier.
+        owner[targets] = claims
+        owner[targets[owner[targets] != claims]] = CONTESTED
+        distance[targets] = level
+        positions = np.arange(targets.size)
+        slot[targets] = positions
+        frontier = targets[slot[targets] == positions]
+        frontier_owner = owner[frontier]
+
+    owned = owner[owner >= 0]
+    counts = np.bincount(owned, minlength=len(heads)).tolist()
+    contested = np.flatnonzero(owner == CONTESTED)
+    return Territory(grid_size, owner, distance, counts, contested)
@@ -0,0 +1,50 @@
+"""
+A bot worker that dies gets restarted, and its players get moves again.
+"""
+import time
+
+import bots.gemini_bot as gemini_bot
+from bot_pool import BotPool, ParallelBotRunner
+from game import Game, grid_size_for_players
+
+PLAYERS = [{'name': 'gemini_bot', 'color': '#4285F4'}] * 2
+
+
+def test_dead_worker_is_restarted(capsys):
+    pool = BotPool(1)
+    try:
+        game = Game(grid_size_for_players(len(PLAYERS)), PLAYERS, seed=1)
+        runner = ParallelBotRunner(pool, [gemini_bot] * len(PLAYERS))
+        runner.run_turns(game)
+        game.update()
+        dead = pool.workers[0].process
+        dead.kill()
+        dead.join()
+
+        deadline = time.monotonic() + 10
+        while pool.workers[0].process is dead or pool.workers[0].job is not None:
+            assert time.monotonic() < deadline, "worker was not restarted"
+            time.sleep(0.01)
+
+        capsys.readouterr()
+        overruns = len(runner.overruns)
+        runner.run_turns(game)
+        assert len(runner.overruns) == overruns
+        # The new process got the players' random streams too
+        assert 'Error' not in capsys.readouterr().out
+        assert pool.workers[0].process.is_alive()
+        runner.close()
+    finally:
+        pool.close()
+
+
+def test_submit_to_a_dead_worker_returns_none():
+    pool = BotPool(1)
+    try:
+        worker = pool.workers[0]
+        with pool._changed:  # Holds the collector off, so the pipe is still the dead one
+            worker.process.kill()
+            worker.process.join()
+            assert pool.submit(worker, 0, None, None, []) is None
+    finally:
+        pool.close()
@@ -0,0 +1,46 @@
+"""
+Endgame plans live in each game's board.memo, so interleaving games
+can't change the moves either of them plays.
+"""
+import random
+
+from bots.endgame import endgame_move
+from game import BoardView
+
+DELTAS = {'UP': (0, -1), 'DOWN': (0, 1), 'LEFT': (-1, 0), 'RIGHT': (1, 0)}
+
+
+def walled_in(seed, size=8):
+    """A solo game on a cluttered board: a generator of its moves."""
+    rng = random.Random(seed)
+    cells = bytearray(2 if rng.random() < 0.3 else 0 for _ in range(size * size))
+    head = rng.choice([i for i, cell in enumerate(cells) if not cell])
+    cells[head] = 1
+    x, y, direction = head % size, head // size, 'UP'
+    memo = {}
+    while True:
+        board = BoardView(size, cells, [(x, y)], [direction], [True], memo=memo)
+        # No wall-clock cut-off, so only the node budget decides
+        direction = endgame_move(board, 0, search_time=60)
+        if direction is None:
+            return
+        yield direction
+        dx, dy = DELTAS[direction]
+        x, y = x + dx, y + dy
+        cells[y * size + x] = 1
+
+
+def test_interleaved_games_play_as_they_do_alone():
+    seeds = range(6)
+    alone = {seed: list(walled_in(seed)) for seed in seeds}
+    games = {seed: walled_in(seed) for seed in seeds}
+    together = {seed: [] for seed in seeds}
+    while games:
+        for seed, moves in list(games.items()):
+            move = next(moves, None)
+            if move is None:
+                del games[seed]
+            else:
+                together[seed].append(move)
+    assert together == alone
+    assert all(alone.values())
@@ -0,0 +1,49 @@
+"""
+The web page resyncs through game_tick while the tick loop pushes to it;
+the push after a resync has to continue from the snapshot it got.
+"""
+import main
+from bot_runner import BotRunner
+from game import Game, grid_size_for_players
+from sessions import SessionManager
+
+PLAYERS = [{'name': f'bot{i}', 'color': '#ffffff'} for i in range(2)]
+
+
+def pushed_session(monkeypatch):
+    monkeypatch.setattr(main, 'sessions', SessionManager())
+    game = Game(grid_size_for_players(len(PLAYERS)), PLAYERS, seed=1)
+    session = main.sessions.create(game, BotRunner([None] * len(PLAYERS)))
+    session.client = object()  # Stands in for the page's websocket
+    session.pushed_tick = game.tick
+    return session
+
+
+def test_push_after_a_lost_frame_continues_from_the_resync(monkeypatch):
+    session = pushed_session(monkeypatch)
+    client_tick = main._advance(session, 1)['tick']
+    main._advance(session, 1)  # Lost on the way: the client is still on client_tick
+    session.start(0.0)         # Ticks are overdue when the client resyncs
+
+    snapshot = main.game_tick(session.id, None)
+    assert snapshot['type'] == 'full'
+    assert snapshot['tick'] == client_tick + 1
+    assert snapshot['tick'] == session.game.tick  # The resync ran no ticks itself
+
+    update = main._advance(session, 1)
+    assert update['since'] == snapshot['tick']
+
+
+def test_resync_between_a_tick_and_its_push(monkeypatch):
+    session = pushed_session(monkeypatch)
+    main._advance(session, 1)
+    snapshots = []
+    run_ticks = main._run_ticks
+
+    def run_then_resync(session, due):
+        run_ticks(session, due)
+        snapshots.append(main.game_tick(session.id, None))
+
+    monkeypatch.setattr(main, '_run_ticks', run_then_resync)
+    update = main._advance(session, 1)
+    assert update['since'] == snapshots[0]['tick']
@@ -0,0 +1,58 @@
+"""
+RegionIndex.claim() keeps the labels incrementally; after any sequence of
+claims they have to describe the same regions as labelling from scratch.
+"""
+import random
+
+from regions import BLOCKED, RegionIndex
+
+
+def regions_of(index):
+    """The free cells grouped by region, independent of the label numbers."""
+    groups = {}
+    for cell, label in enumerate(index.labels):
+        if label != BLOCKED:
+            groups.setdefault(label, set()).add(cell)
+    return sorted(sorted(cells) for cells in groups.values())
+
+
+def assert_matches_relabel(index, cells):
+    fresh = RegionIndex(index.grid_size, cells)
+    assert regions_of(index) == regions_of(fresh)
+    for label, size in index.sizes.items():
+        assert size == index.labels.count(label)
+
+
+def test_random_claims_match_full_relabel():
+    rng = random.Random(1)
+    for size in (1, 2, 5, 12):
+        cells = bytearray(size * size)
+        index = RegionIndex(size, cells)
+        order = list(range(size * size))
+        rng.shuffle(order)
+        for cell in order:
+            cells[cell] = 1
+            index.claim(cell)
+            assert_matches_relabel(index, cells)
+
+
+def test_walls_that_cut_the_board_match_full_relabel():
+    # Straight walls make long chokepoints: every claim on them can split
+    size = 16
+    cells = bytearray(size * size)
+    index = RegionIndex(size, cells)
+    for x in range(size):
+        for cell in (5 * size + x, x * size + 9):
+            if not cells[cell]:
+                cells[cell] = 1
+                index.claim(cell)
+                assert_matches_relabel(index, cells)
+    assert len(index.sizes) == 4
+
+
+def test_claiming_an_occupied_cell_changes_nothing():
+    cells = bytearray(9)
+    cells[4] = 1
+    index = RegionIndex(3, cells)
+    index.claim(4)
+    assert index.sizes == {index.labels[0]: 8}
@@ -0,0 +1,52 @@
+"""
+A replay played back to any tick has to be the game as it was live at that tick.
+"""
+import random
+
+from game import Game, DIRECTIONS, grid_size_for_players
+from replay import ReplayReader, ReplayWriter
+
+PLAYERS = [{'name': f'bot{i}', 'color': '#ffffff'} for i in range(4)]
+
+
+def snapshot(game):
+    state = game.get_state()
+    return state, bytes(game.grid), dict(game.regions.sizes)
+
+
+def test_game_at_matches_the_live_game(tmp_path):
+    path = tmp_path / 'game.tronr'
+    rng = random.Random(3)
+    game = Game(grid_size_for_players(len(PLAYERS)), PLAYERS, seed=3)
+    game.replay = ReplayWriter(path, game, keyframe_interval=7)
+
+    live = {0: snapshot(game)}
+    while not game.game_over:
+        for p in game.players:
+            if p.is_alive and rng.random() < 0.3:
+                game.submit_move(p.id, rng.choice(DIRECTIONS))
+        game.update()
+        live[game.tick] = snapshot(game)
+
+    reader = ReplayReader(path)
+    assert reader.finished
+    assert reader.last_tick == game.tick
+    assert reader.winner == game.winner
+    for tick, expected in live.items():
+        state, grid, sizes = snapshot(reader.game_at(tick))
+        assert state == expected[0], tick
+        assert grid == expected[1], tick
+        assert sorted(sizes.values()) == sorted(expected[2].values()), tick
+
+
+def test_abandoned_game_is_readable_up_to_its_last_keyframe(tmp_path):
+    path = tmp_path / 'game.tronr'
+    game = Game(grid_size_for_players(len(PLAYERS)), PLAYERS, seed=5)
+    game.replay = ReplayWriter(path, game, keyframe_interval=4)
+    for _ in range(6):
+        game.update()
+    game.replay.close()
+
+    reader = ReplayReader(path)
+    assert not reader.finished
+    assert reader.game_at(6).tick == 6
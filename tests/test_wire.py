@@ -0,0 +1,33 @@
+"""
+A decoded frame has to carry exactly what Game.get_update() returns for
+the same game and `since` tick, as the client sees it after JSON.
+"""
+import json
+import random
+
+from game import Game, DIRECTIONS, grid_size_for_players
+from wire import decode_frame, encode_frame
+
+PLAYERS = [{'name': f'bot{i}', 'color': '#ffffff'} for i in range(5)]
+
+
+def play(seed):
+    """Yields the game after every tick of a randomly steered game."""
+    rng = random.Random(seed)
+    game = Game(grid_size_for_players(len(PLAYERS)), PLAYERS, seed=seed)
+    yield game
+    while not game.game_over:
+        for p in game.players:
+            if p.is_alive and rng.random() < 0.3:
+                game.submit_move(p.id, rng.choice(DIRECTIONS))
+        game.update()
+        yield game
+
+
+def test_frames_decode_to_get_update():
+    rng = random.Random(7)
+    for game in play(7):
+        for since in {None, 0, game.tick, max(0, game.tick - 1), rng.randint(0, game.tick)}:
+            expected = json.loads(json.dumps(game.get_update(since)))
+            decoded = decode_frame(encode_frame(game, since), PLAYERS)
+            assert decoded == expected, (game.tick, since)
@@ -0,0 +1,228 @@
+"""
+Round-robin tournament runner.
+
+Every round plays each pair of bots once plus one free-for-all with all of
+them, spread over a process pool. Seats (player ids and spawn points) are
+turned round from one round to the next, so seat advantage evens out. Each finished game is appended to a JSONL
+results file right away, so an interrupted run picks up where it left off
+when started again with the same arguments.
+
+Example:
+    python tournament.py --rounds 500 --out results.jsonl
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bot_runner import AVAILABLE_BOT_NAMES
+from simulate import play_match
+
+ELO_START = 1500
+ELO_K = 16
+
+
+# --- 1. Scheduling ---
+def build_schedule(bot_names, rounds, seed, ffa=True):
+    """
+    Lists every game of the tournament as
+    {'game': index, 'bots': [...], 'seed': int}.
+    Game i always gets seed + i, so the schedule (and the results)
+    only depend on the arguments. Seat 0 moves first and spawns in a
+    different place, so odd rounds play each pairing the other way
+    round, and the free-for-all's seating rotates by one every round.
+    """
+    pairings = list(itertools.combinations(bot_names, 2))
+    schedule = []
+    for round_index in range(rounds):
+        for pair in pairings:
+            schedule.append(list(pair) if round_index % 2 == 0 else list(reversed(pair)))
+        if ffa and len(bot_names) > 2:
+            shift = round_index % len(bot_names)
+            schedule.append(list(bot_names[shift:]) + list(bot_names[:shift]))
+
+    return [
+        {'game': i, 'bots': bots, 'seed': seed + i}
+        for i, bots in enumerate(schedule)
+    ]
+
+
+def _play_scheduled(entry, replay_dir=None):
+    # Runs in a worker process
+    replay_path = None
+    if replay_dir:
+        replay_path = os.path.join(replay_dir, f"game-{entry['game']}.tronr")
+    result = play_match(entry['bots'], seed=entry['seed'], replay_path=replay_path)
+    result.update(entry)
+    return result
+
+
+# --- 2. Results file ---
+def load_results(path, config):
+    """
+    Reads a results file written by run_tournament. The first line holds the
+    config it was started with; resuming with a different config is an error.
+    Returns {game index: result}.
+    """
+    results = {}
+    if not os.path.exists(path):
+        return results
+
+    with open(path) as f:
+        lines = [line for line in f if line.strip()]
+    if not lines:
+        return results
+
+    started_with = dict(json.loads(lines[0]).get('config', {}))
+    started_with.pop('rounds', None)
+    wanted = {key: value for key, value in config.items() if key != 'rounds'}
+    if started_with != wanted:
+        raise ValueError(
+            f"{path} was started with {started_with}, not {wanted}. "
+            "Use a different --out file or the same arguments."
+        )
+    for line in lines[1:]:
+        try:
+            result = json.loads(line)
+        except json.JSONDecodeError:
+            # Last line may be cut off if the run was killed mid-write
+            continue
+        results[result['game']] = result
+    return results
+
+
+def run_tournament(bot_names, rounds, out_path, seed=0, ffa=True, workers=None,
+                   replay_dir=None):
+    """
+    Plays every scheduled game not already in out_path and returns all results.
+    With replay_dir, game i is recorded to replay_dir/game-<i>.tronr.
+    """
+    # 'seating' keeps files from before seats alternated from being resumed
+    config = {'bots': list(bot_names), 'rounds': rounds, 'seed': seed, 'ffa': ffa,
+              'seating': 'alternating'}
+    schedule = build_schedule(bot_names, rounds, seed, ffa)
+    results = load_results(out_path, config)
+    pending = [entry for entry in schedule if entry['game'] not in results]
+
+    print(f"{len(schedule)} games scheduled, {len(results)} already done, "
+          f"{len(pending)} to play")
+    if not pending:
+        return results
+
+    if replay_dir:
+        os.makedirs(replay_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    with open(out_path, 'a') as out:
+        if out.tell() == 0:
+            out.write(json.dumps({'config': config}) + '\n')
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_play_scheduled, entry, replay_dir) for entry in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results[result['game']] = result
+                out.write(json.dumps(result) + '\n')
+                out.flush()
+
+                if done % 100 == 0 or done == len(pending):
+                    elapsed = time.perf_counter() - start
+                    print(f"  {done}/{len(pending)} games, {done / elapsed:.1f} games/sec")
+
+    return results
+
+
+# --- 3. Ratings ---
+def _expected(rating_a, rating_b):
+    return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
+
+
+def summarize(results, bot_names):
+    """
+    Aggregates results per bot: wins, draws, losses, average survival ticks
+    and an Elo rating. Games are rated in schedule order so the ratings don't
+    depend on which worker finished first. A free-for-all counts as every
+    pair of its players meeting, scored by who survived longer, with K
+    split across the opponents.
+    """
+    stats = {
+        name: {'games': 0, 'wins': 0, 'draws': 0, 'losses': 0,
+               'survival': 0, 'elo': float(ELO_START)}
+        for name in bot_names
+    }
+
+    for index in sorted(results):
+        result = results[index]
+        bots = result['bots']
+        survival = result['survival']
+
+        for name, ticks in zip(bots, survival):
+            entry = stats[name]
+            entry['games'] += 1
+            entry['survival'] += ticks
+            if result['winner'] == 'DRAW':
+                entry['draws'] += 1
+            elif result['winner'] == name:
+                entry['wins'] += 1
+            else:
+                entry['losses'] += 1
+
+        k = ELO_K / (len(bots) - 1)
+        changes = {name: 0.0 for name in bots}
+        for a, b in itertools.combinations(range(len(bots)), 2):
+            name_a, name_b = bots[a], bots[b]
+            if survival[a] > survival[b]:
+                score = 1.0
+            elif survival[a] < survival[b]:
+                score = 0.0
+            else:
+                score = 0.5
+            expected = _expected(stats[name_a]['elo'], stats[name_b]['elo'])
+            changes[name_a] += k * (score - expected)
+            changes[name_b] -= k * (score - expected)
+        for name, change in changes.items():
+            stats[name]['elo'] += change
+
+    for entry in stats.values():
+        entry['avg_survival'] = entry['survival'] / entry['games'] if entry['games'] else 0.0
+        del entry['survival']
+    return stats
+
+
+def print_standings(stats):
+    print(f"{'bot':<14} {'elo':>6} {'games':>6} {'W':>6} {'D':>6} {'L':>6} {'avg ticks':>10}")
+    for name, entry in sorted(stats.items(), key=lambda item: -item[1]['elo']):
+        print(f"{name:<14} {entry['elo']:>6.0f} {entry['games']:>6} {entry['wins']:>6} "
+              f"{entry['draws']:>6} {entry['losses']:>6} {entry['avg_survival']:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round-robin bot tournament.")
+    parser.add_argument('--bots', nargs='+', default=AVAILABLE_BOT_NAMES,
+                        choices=AVAILABLE_BOT_NAMES, metavar='BOT')
+    parser.add_argument('--rounds', type=int, default=10,
+                        help="each round is every pairing once plus one free-for-all")
+    parser.add_argument('--out', default='tournament_results.jsonl',
+                        help="results file; re-run with the same arguments to resume")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-ffa', action='store_true', help="only play 1v1 pairings")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: one per core)")
+    parser.add_argument('--replays', metavar='DIR', default=None,
+                        help="record every game to DIR/game-<i>.tronr (see replay.py)")
+    args = parser.parse_args(argv)
+
+    bot_names = list(dict.fromkeys(args.bots))  # drop repeats, keep order
+    if len(bot_names) < 2:
+        parser.error("need at least 2 different bots")
+
+    results = run_tournament(bot_names, args.rounds, args.out, args.seed,
+                             ffa=not args.no_ffa, workers=args.workers,
+                             replay_dir=args.replays)
+    print_standings(summarize(results, bot_names))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Compact binary frames for the state updates sent to the frontend.
+
+The JSON updates from Game.get_update() spell everything out: names,
+hex colours, direction strings and a [x, y] list per cell. A frame
+carries the same information as packed numbers; names and colours are
+left out, since the client already has them from the JSON snapshot
+start_game returns.
+
+Layout (little-endian):
+    header   version (u8), type (u8), flags (u8), index width (u8),
+             tick (u32), since (u32), grid size (u16), player count (u16),
+             winner (i16: player id, -1 none yet, -2 draw)
+    status   4 bits per player, two players per byte (low nibble first):
+             bit 2 = alive, bits 0-1 = direction code (game.DIRECTIONS)
+    count    number of entries (u16)
+    entries  per entry: player id (u16), new cell count (u16 in a delta,
+             u32 in a full frame)
+    crashes  count (u16), then per listed player whose head is off the
+             board (it ran into a wall): player id (u16), x, y (i16)
+    cells    every entry's new trail cells in order, as cell indices
+             (y * grid size + x), u16 if the grid has at most 65536
+             cells, u32 beyond that
+A FRAME_FULL has an entry with the whole trail for every player; a
+FRAME_DELTA only has the players that moved or died after `since`. A
+player listed with its alive bit clear died in that window. Heads are
+the last trail cell, except for the crashes.
+"""
+import struct
+import sys
+from array import array
+
+from game import DIRECTIONS, STATE_PROTOCOL_VERSION
+
+WIRE_VERSION = 1
+
+FRAME_FULL = 0
+FRAME_DELTA = 1
+
+FLAG_GAME_OVER = 1
+
+_HEADER = struct.Struct('<BBBBIIHHh')
+_COUNT = struct.Struct('<H')
+_DELTA_ENTRY = struct.Struct('<HH')
+_FULL_ENTRY = struct.Struct('<HI')
+_CRASH = struct.Struct('<Hhh')
+
+# Winner and `since` encodings
+_NO_WINNER = -1
+_DRAW = -2
+_NO_SINCE = 0xFFFFFFFF
+
+_ALIVE_BIT = 4
+_SWAP = sys.byteorder == 'big'
+
+
+def index_width(grid_size):
+    return 2 if grid_size * grid_size <= 0x10000 else 4
+
+
+def _encode_winner(winner):
+    if winner is None:
+        return _NO_WINNER
+    if winner == 'DRAW':
+        return _DRAW
+    return winner
+
+
+def _decode_winner(winner):
+    return {_NO_WINNER: None, _DRAW: 'DRAW'}.get(winner, winner)
+
+
+# --- 1. Encoding ---
+def encode_frame(game, since_tick=None):
+    """
+    The binary counterpart of game.get_update(since_tick): a full frame
+    if since_tick is None or out of range, otherwise a delta.
+    """
+    players = game.players
+    full = since_tick is None or not (0 <= since_tick <= game.tick)
+    width = index_width(game.grid_size)
+
+    status = bytearray((len(players) + 1) // 2)
+    for p in players:
+        nibble = p.direction | (_ALIVE_BIT if p.is_alive else 0)
+        status[p.id >> 1] |= nibble << ((p.id & 1) * 4)
+
+    entry = _FULL_ENTRY if full else _DELTA_ENTRY
+    size = game.grid_size
+    entries = []
+    crashes = []
+    cells = array('H' if width == 2 else 'I')
+    start = 0 if full else since_tick + 1
+    for p in players:
+        new_cells = p.trail[start:]
+        died = p.death_tick is not None and p.death_tick > (since_tick or 0)
+        if not (full or new_cells or died):
+            continue
+        entries.append(entry.pack(p.id, len(new_cells)))
+        if not (0 <= p.x < size and 0 <= p.y < size):
+            crashes.append(_CRASH.pack(p.id, p.x, p.y))
+        if width == 2:
+            cells.extend(array('H', new_cells))
+        else:
+            cells.extend(new_cells)
+    if _SWAP:
+        cells.byteswap()
+
+    header = _HEADER.pack(
+        WIRE_VERSION,
+        FRAME_FULL if full else FRAME_DELTA,
+        FLAG_GAME_OVER if game.game_over else 0,
+        width,
+        game.tick,
+        _NO_SINCE if full else since_tick,
+        game.grid_size,
+        len(players),
+        _encode_winner(game.winner),
+    )
+    return b''.join((header, status, _COUNT.pack(len(entries)), *entries,
+                     _COUNT.pack(len(crashes)), *crashes, cells.tobytes()))
+
+
+# --- 2. Decoding ---
+def decode_frame(frame, player_config=None):
+    """
+    Reads a frame back into the same dict shape as Game.get_update().
+    player_config ([{'name', 'color'}, ...]) fills in names and colours
+    for full frames; without it they're left out.
+    """
+    version, kind, flags, width, tick, since, grid_size, player_count, winner = \
+        _HEADER.unpack_from(frame, 0)
+    if version != WIRE_VERSION:
+        raise ValueError(f"Wire frame version {version}, expected {WIRE_VERSION}")
+    offset = _HEADER.size
+
+    alive = []
+    directions = []
+    for player_id in range(player_count):
+        nibble = (frame[offset + (player_id >> 1)] >> ((player_id & 1) * 4)) & 0xF
+        alive.append(bool(nibble & _ALIVE_BIT))
+        directions.append(DIRECTIONS[nibble & 3])
+    offset += (player_count + 1) // 2
+
+    entry = _FULL_ENTRY if kind == FRAME_FULL else _DELTA_ENTRY
+    (entry_count,) = _COUNT.unpack_from(frame, offset)
+    offset += _COUNT.size
+    entries = []
+    for _ in range(entry_count):
+        entries.append(entry.unpack_from(frame, offset))
+        offset += entry.size
+
+    (crash_count,) = _COUNT.unpack_from(frame, offset)
+    offset += _COUNT.size
+    crashes = {}
+    for _ in range(crash_count):
+        player_id, x, y = _CRASH.unpack_from(frame, offset)
+        crashes[player_id] = (x, y)
+        offset += _CRASH.size
+
+    cells = array('H' if width == 2 else 'I')
+    cells.frombytes(frame[offset:])
+    if _SWAP:
+        cells.byteswap()
+
+    def as_xy(player_id, new_cells):
+        xy = [[index % grid_size, index // grid_size] for index in new_cells]
+        # A crash off the board isn't a cell, but JSON updates end the trail with it
+        if player_id in crashes:
+            xy.append(list(crashes[player_id]))
+        return xy
+
+    common = {
+        'version': STATE_PROTOCOL_VERSION,
+        'tick': tick,
+        'game_over': bool(flags & FLAG_GAME_OVER),
+        'winner': _decode_winner(winner),
+    }
+    position = 0
+    if kind == FRAME_FULL:
+        players = []
+        for player_id, count in entries:
+            new_cells = cells[position:position + count]
+            position += count
+            if player_id in crashes:
+                x, y = crashes[player_id]
+            else:
+                x, y = new_cells[-1] % grid_size, new_cells[-1] // grid_size
+            player = {
+                'id': player_id,
+                'x': x,
+                'y': y,
+                'direction': directions[player_id],
+                'is_alive': alive[player_id],
+                'trail': as_xy(player_id, new_cells),
+            }
+            if player_config is not None:
+                player['name'] = player_config[player_id]['name']
+                player['color'] = player_config[player_id]['color']
+            players.append(player)
+        return {'type': 'full', 'grid_size': grid_size, 'players': players, **common}
+
+    changed = []
+    dead = []
+    for player_id, count in entries:
+        new_cells = cells[position:position + count]
+        position += count
+        if not alive[player_id]:
+            dead.append(player_id)
+        xy = as_xy(player_id, new_cells)
+        if xy:
+            changed.append({'id': player_id, 'cells': xy, 'direction': directions[player_id]})
+    return {'type': 'delta', 'since': since, 'cells': changed, 'dead': dead, **common}